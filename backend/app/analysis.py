@@ -1,10 +1,13 @@
-import requests
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+import httpx
 from dotenv import load_dotenv
 import os
 from bs4 import BeautifulSoup
 import json
 from google import genai
-import concurrent.futures
 import re
 import spacy
 
@@ -20,8 +23,73 @@ model = "gemini-2.5-flash"
 
 nlp = spacy.load("en_core_web_sm")
 
+BROWSER_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116.0.0.0 Safari/537.36'
+# One keep-alive client for every outbound call, shared by all analyses in the process.
+HTTP_MAX_CONNECTIONS = int(os.getenv("ANALYSIS_MAX_CONNECTIONS", "64"))
+HTTP_MAX_PER_HOST = int(os.getenv("ANALYSIS_MAX_PER_HOST", "4"))
+HTTP_TIMEOUT = httpx.Timeout(float(os.getenv("ANALYSIS_HTTP_TIMEOUT", "10")), connect=5.0)
 
-def extract_search_query(topic: str) -> str:
+_http = None
+# host -> [semaphore, requests holding or waiting for it]; idle hosts are dropped.
+_host_slots = {}
+
+
+def _http_client():
+    global _http
+    if _http is None:
+        _http = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS, max_keepalive_connections=HTTP_MAX_CONNECTIONS // 2),
+            timeout=HTTP_TIMEOUT,
+            follow_redirects=True,
+        )
+    return _http
+
+
+@asynccontextmanager
+async def _host_slot(url):
+    """Cap concurrent requests per host so one site can't take the whole pool."""
+    host = httpx.URL(url).host
+    slot = _host_slots.get(host)
+    if slot is None:
+        slot = _host_slots[host] = [asyncio.Semaphore(HTTP_MAX_PER_HOST), 0]
+    slot[1] += 1
+    try:
+        async with slot[0]:
+            yield
+    finally:
+        slot[1] -= 1
+        if slot[1] == 0 and _host_slots.get(host) is slot:
+            del _host_slots[host]
+
+
+async def _get(url, **kwargs):
+    async with _host_slot(url):
+        return await _http_client().get(url, **kwargs)
+
+
+# Article downloads: whole-request deadline and how much of a page is read before parsing.
+ARTICLE_FETCH_TIMEOUT = float(os.getenv("ARTICLE_FETCH_TIMEOUT", "5"))
+ARTICLE_MAX_BYTES = int(os.getenv("ARTICLE_MAX_BYTES", str(1024 * 1024)))
+
+
+# Finished analyses by normalized topic. Fresh for ANALYSIS_CACHE_TTL seconds, then served
+# stale (while one background run refreshes them) for up to ANALYSIS_CACHE_MAX_STALE more.
+ANALYSIS_CACHE_TTL = float(os.getenv("ANALYSIS_CACHE_TTL", "600"))
+ANALYSIS_CACHE_MAX_STALE = float(os.getenv("ANALYSIS_CACHE_MAX_STALE", "3600"))
+ANALYSIS_CACHE_SIZE = int(os.getenv("ANALYSIS_CACHE_SIZE", "256"))
+
+_results = OrderedDict()
+_refreshing = {}
+
+
+async def close_http_client():
+    global _http
+    if _http is not None:
+        await _http.aclose()
+        _http = None
+
+
+async def extract_search_query(topic: str) -> str:
     """Use Gemini to extract the most important and relevant proper noun/topic from the input."""
     prompt = (
         "Given the following market topic, extract the single most important and relevant proper noun or topic "
@@ -29,7 +97,7 @@ def extract_search_query(topic: str) -> str:
         f"Market topic: {topic}"
     )
     try:
-        response = client.models.generate_content(
+        response = await client.aio.models.generate_content(
             model=model,
             contents=prompt,
         )
@@ -41,7 +109,7 @@ def extract_search_query(topic: str) -> str:
         return topic
 
 
-def analyze_sentiment_articles(text):
+async def analyze_sentiment_articles(text):
     prompt = f"You are a finanical analyst/short-term market analyst. Assuming both sentiments have properly \
     generated with no errors, analyze the general sentiment of the following collection \
         of article snippets. Respond with 'positive', 'negative', \
@@ -54,7 +122,7 @@ def analyze_sentiment_articles(text):
                     Respond without bias. Aim for 70-100 words:\n{text}"
     try:
         print("Analyzing sentiment of articles...")
-        response = client.models.generate_content(
+        response = await client.aio.models.generate_content(
             model=model,
             contents=prompt,
         )
@@ -64,11 +132,11 @@ def analyze_sentiment_articles(text):
         return f"Sentiment analysis of articles failed due to an error: {e}"
 
 
-def analyze_sentiment_discussions(text):
+async def analyze_sentiment_discussions(text):
     prompt = f"Analyze the sentiment of the following collection of forum snippets. Respond with 'positive', 'negative', or 'neutral'. Then, respond with a summary of the contents and the sentiment.:\n{text}"
     try:
         print("Analyzing sentiment of discussions...")
-        response = client.models.generate_content(
+        response = await client.aio.models.generate_content(
             model=model,
             contents=prompt,
         )
@@ -78,7 +146,7 @@ def analyze_sentiment_discussions(text):
         return f"Sentiment analysis of discussions failed due to an error: {e}"
 
 
-def analyze_sentiment_combined(text):
+async def analyze_sentiment_combined(text):
     prompt = f"Discuss how the sentiment you analyzed from recent \
         news articles compares to the sentiment you analyzed from \
             recent online discussions. Are they similar or \
@@ -88,7 +156,7 @@ def analyze_sentiment_combined(text):
                             topic. Limit your output to 60 words.:\n{text}"
     try:
         print("Analyzing combined sentiment...")
-        response = client.models.generate_content(
+        response = await client.aio.models.generate_content(
             model=model,
             contents=prompt,
         )
@@ -98,7 +166,7 @@ def analyze_sentiment_combined(text):
         return f"Combined sentiment analysis failed due to an error: {e}"
 
 
-def brave_search_discussions(topic, original_topic=None):
+async def brave_search_discussions(topic, original_topic=None):
     no_of_discussions = 5
     headers = {
         "Accept": "application/json",
@@ -106,12 +174,12 @@ def brave_search_discussions(topic, original_topic=None):
     }
 
     params = {
-        "q": extract_search_query(topic),
+        "q": await extract_search_query(topic),
         "result_filter": "discussions"
     }
     print("Searching for online discussions...")
     response = None
-    response = requests.get(
+    response = await _get(
         "https://api.search.brave.com/res/v1/web/search",
         headers=headers,
         params=params,
@@ -138,11 +206,68 @@ def brave_search_discussions(topic, original_topic=None):
     if aggregated_discussion_text == "":
         response = f"No discussions could be retrieved for the topic {topic}"
     else:
-        response = analyze_sentiment_discussions(aggregated_discussion_text)
+        response = await analyze_sentiment_discussions(aggregated_discussion_text)
     return response
 
 
-def newsdataio_search_news(topic, original_topic=None):
+def _paragraph_text(html, max_chars):
+    soup = BeautifulSoup(html, "html.parser")
+    return "\n".join(p.get_text() for p in soup.find_all("p"))[:max_chars]
+
+
+async def _download_article(url):
+    body = bytearray()
+    async with _host_slot(url):
+        async with _http_client().stream("GET", url, headers={'User-Agent': BROWSER_USER_AGENT}) as response:
+            if response.status_code != 200:
+                print(response)
+                return None
+            async for chunk in response.aiter_bytes():
+                body += chunk
+                # The text we keep sits near the top of the page; stop reading past the cap.
+                if len(body) >= ARTICLE_MAX_BYTES:
+                    break
+    return bytes(body[:ARTICLE_MAX_BYTES])
+
+
+async def _fetch_article_text(url, max_chars):
+    """Paragraph text of one article, or None if it failed, timed out or had no text."""
+    try:
+        html = await asyncio.wait_for(_download_article(url), ARTICLE_FETCH_TIMEOUT)
+        if html is None:
+            return None
+        # Parsing is CPU-bound; keep it off the event loop.
+        text = await asyncio.to_thread(_paragraph_text, html, max_chars)
+    except Exception as e:
+        # Timeouts, HTTP errors, malformed links: skip this article, keep the others.
+        print(f"Article fetch failed for {url}: {e!r}")
+        return None
+    return text or None
+
+
+async def _fetch_articles(links, target, max_chars):
+    """
+    Fetch every candidate link concurrently and return the texts of the first
+    `target` usable articles, in arrival order; the remaining downloads are
+    cancelled as soon as enough have arrived.
+    """
+    tasks = [asyncio.create_task(_fetch_article_text(link, max_chars)) for link in links]
+    texts = []
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            text = await next_done
+            if text:
+                texts.append(text)
+                if len(texts) >= target:
+                    break
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return texts
+
+
+async def newsdataio_search_news(topic, original_topic=None):
     number_of_articles = 4
     number_of_characters_per_article = 700
     params = {
@@ -154,7 +279,7 @@ def newsdataio_search_news(topic, original_topic=None):
     }
 
     response = None
-    response = requests.get(
+    response = await _get(
         "https://newsdata.io/api/1/latest",
         params=params,
     )
@@ -166,52 +291,129 @@ def newsdataio_search_news(topic, original_topic=None):
 
     with open(NEWSDATA_PATH, "r") as f:
         newsdata = json.load(f)
-    article_text_aggregated = ""
-    article_count = 0
     print("extracting articles")
-    for article in newsdata.get("results", []):
-        response = requests.get(article.get("link"),
-                                headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116.0.0.0 Safari/537.36'}
-                                )
-        if response.status_code == 200 and article_count < number_of_articles:
-            article_count += 1
-            soup = BeautifulSoup(response.content, "html.parser")
-            paragraphs = soup.find_all("p")
-            article_text = "\n".join(p.get_text() for p in paragraphs)[:number_of_characters_per_article]
-            article_text_aggregated += article_text + "\n\n"
-        elif article_count >= number_of_articles:
-            break
-        else:
-            print(response)
+    links = [article.get("link") for article in newsdata.get("results", []) if article.get("link")]
+    article_texts = await _fetch_articles(links, number_of_articles, number_of_characters_per_article)
+    article_text_aggregated = "".join(text + "\n\n" for text in article_texts)
 
     #print(article_text_aggregated)
     response = ""
     if article_text_aggregated == "":
         response = f"No articles could be retrieved for the topic {topic}"
     else:
-        response = analyze_sentiment_articles(article_text_aggregated)
+        response = await analyze_sentiment_articles(article_text_aggregated)
     return response
 
 
-def main(topic):
+async def _analyze(topic):
     original_topic = topic
-    search_query = extract_search_query(topic)
-    with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-        brave_future = executor.submit(brave_search_discussions, search_query, original_topic)
-        news_future = executor.submit(newsdataio_search_news, search_query, original_topic)
-    brave_response = brave_future.result()
-    news_response = news_future.result()
+    search_query = await extract_search_query(topic)
+    brave_response, news_response = await asyncio.gather(
+        brave_search_discussions(search_query, original_topic),
+        newsdataio_search_news(search_query, original_topic),
+    )
     print(news_response)
-    combined = analyze_sentiment_combined(
+    combined = await analyze_sentiment_combined(
         f"Online Discussion Sentiment Analysis: {brave_response}\n\nNews Article Sentiment Analysis: {news_response}"
     )
     print(f'\n\nCombined analysis: {combined}')
-    return combined
+    return {
+        "discussions": brave_response,
+        "news": news_response,
+        "combined": combined,
+        # Raw search payloads, so a cache hit can put them back for /newsdata/ and /redditData/.
+        "newsdata": _read_topic_file(NEWSDATA_PATH, original_topic),
+        "redditdata": _read_topic_file(REDDITDATA_PATH, original_topic),
+    }
+
+
+def _topic_key(topic):
+    return " ".join(re.findall(r"\w+", topic.lower()))
+
+
+def _read_topic_file(path, topic):
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    return data if data.get("topic") == topic else None
+
+
+def _restore_topic_files(topic, result):
+    for path, data in ((NEWSDATA_PATH, result["newsdata"]), (REDDITDATA_PATH, result["redditdata"])):
+        if data is None or _read_topic_file(path, topic) is not None:
+            continue
+        with open(path, "w") as f:
+            json.dump({**data, "topic": topic}, f, indent=4)
+
+
+def _is_degraded(result):
+    # The Gemini helpers report failures in their text instead of raising; don't keep those.
+    return any("failed due to an error" in result[k] for k in ("discussions", "news", "combined"))
+
+
+async def _refresh(key, topic):
+    try:
+        result = await _analyze(topic)
+    finally:
+        _refreshing.pop(key, None)
+    if not _is_degraded(result):
+        _results[key] = (result, time.monotonic())
+        _results.move_to_end(key)
+        while len(_results) > ANALYSIS_CACHE_SIZE:
+            _results.popitem(last=False)
+    return result
+
+
+def _start_refresh(key, topic):
+    """One analysis per topic at a time; concurrent callers share the running task."""
+    task = _refreshing.get(key)
+    if task is None:
+        task = _refreshing[key] = asyncio.create_task(_refresh(key, topic))
+    return task
+
+
+def _log_refresh_failure(task):
+    if not task.cancelled() and task.exception() is not None:
+        print(f"[analysis] Background refresh failed: {task.exception()!r}")
+
+
+async def analyze(topic):
+    """
+    Discussion, news and combined analysis for `topic`, served from the
+    cache when the same normalized topic was analysed recently. Past the TTL
+    the stale result is returned at once and refreshed in the background.
+    """
+    key = _topic_key(topic)
+    entry = _results.get(key)
+    if entry is not None:
+        result, fetched_at = entry
+        age = time.monotonic() - fetched_at
+        if age < ANALYSIS_CACHE_TTL + ANALYSIS_CACHE_MAX_STALE:
+            _results.move_to_end(key)
+            if age >= ANALYSIS_CACHE_TTL and key not in _refreshing:
+                _start_refresh(key, topic).add_done_callback(_log_refresh_failure)
+            _restore_topic_files(topic, result)
+            return result
+    # Shielded: a caller that goes away does not cancel the run other callers wait on.
+    return await asyncio.shield(_start_refresh(key, topic))
+
+
+async def main(topic):
+    return (await analyze(topic))["combined"]
+
+
+async def _run_once(topic):
+    try:
+        return await main(topic)
+    finally:
+        await close_http_client()
 
 
 if __name__ == "__main__":
     topic = "When will Cluely officially announce an IPO?"
     #brave_search_discussions(extract_search_query(topic))
     #newsdataio_search_news(topic)
-    main(topic)
+    asyncio.run(_run_once(topic))
     #extract_search_query(topic)
\ No newline at end of file
@@ -22,8 +22,8 @@ def _load_json_topic_file(file_name):
 
 
 @router.post("/analyze/")
-def analyze_topic(topic: str = Query(None)):
-    result = run_analysis(topic)
+async def analyze_topic(topic: str = Query(None)):
+    result = await run_analysis(topic)
     return {"result": result}
 
 
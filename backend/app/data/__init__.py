@@ -1,7 +1,18 @@
 from .market_loader import (
-    all_markets as markets,
+    get_catalog,
+    get_facets,
     get_market_by_id,
+    get_mark_prices,
+    get_markets_by_ids,
     get_markets_page,
+    reload_catalog,
+    request_reload,
+    resolve_fields,
+    resolve_filters,
+    resolve_page,
+    resolve_sort,
+    start_refresher,
+    stop_refresher,
     CATEGORIES,
 )
 from .mock_data import (
@@ -13,9 +24,20 @@ from .mock_data import (
 )
 
 __all__ = [
-    "markets",
+    "get_catalog",
+    "get_facets",
     "get_market_by_id",
+    "get_mark_prices",
+    "get_markets_by_ids",
     "get_markets_page",
+    "reload_catalog",
+    "request_reload",
+    "resolve_fields",
+    "resolve_filters",
+    "resolve_page",
+    "resolve_sort",
+    "start_refresher",
+    "stop_refresher",
     "CATEGORIES",
     "positions",
     "news_items",
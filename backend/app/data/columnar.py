@@ -0,0 +1,36 @@
+"""
+Array encodings shared by the catalog snapshot.
+
+Everything in a snapshot is a plain NumPy array: string lists become one
+UTF-8 byte buffer plus row offsets, and ragged integer lists (search
+postings) become one flat array plus offsets. No pickling is involved.
+"""
+import numpy as np
+
+
+def pack_strings(strings):
+    """(bytes, offsets): UTF-8 buffer of all strings and len(strings) + 1 offsets into it."""
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), _compact_offsets(offsets)
+
+
+def _compact_offsets(offsets):
+    return offsets.astype(np.uint32) if offsets[-1] <= np.iinfo(np.uint32).max else offsets
+
+
+def unpack_strings(data, offsets):
+    raw = data.tobytes()
+    bounds = offsets.tolist()
+    return [raw[bounds[i]:bounds[i + 1]].decode("utf-8") for i in range(len(bounds) - 1)]
+
+
+def pack_ragged(lists, dtype=np.uint32):
+    """(values, offsets) for a list of integer sequences."""
+    offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+    np.cumsum([len(values) for values in lists], out=offsets[1:])
+    values = np.empty(int(offsets[-1]), dtype=dtype)
+    for i, part in enumerate(lists):
+        values[offsets[i]:offsets[i + 1]] = part
+    return values, _compact_offsets(offsets)
@@ -1,106 +1,103 @@
 """
 Loads real markets from JSON files, enriches with random pricing data,
 and exposes paginated/filtered access for the API.
+
+Markets are held column-wise in a MarketStore (NumPy arrays for prices,
+volumes and price history); response dicts are built only for returned rows.
+
+The enriched catalog (market store and search index) is cached as a columnar
+snapshot next to the source files: one .npy file per array, memory-mapped on
+load, and reused until either source file changes, so restarts skip JSON
+parsing, enrichment and indexing entirely.
+
+A background refresher polls the source files and rebuilds the catalog off
+the request path; readers grab the current Catalog once per call, so a swap
+never exposes a half-built list, index or view.
 """
+import base64
+import binascii
 import json
 import math
+import os
 import random
 import re
+import shutil
+import threading
 from pathlib import Path
 
+import numpy as np
+
+from .market_store import FIELDS, HISTORY_POINTS, MISSING_VALUES, SORT_COLUMNS, SORT_DIRECTIONS, SOURCES, SUMMARY_FIELDS, MarketStore
+from .search_index import SearchIndex
+
 DATA_DIR = Path(__file__).parent / "data"
+SNAPSHOT_DIR = DATA_DIR / "markets-snapshot"
+# Pickle snapshot written by earlier versions; removed once a columnar one exists.
+LEGACY_SNAPSHOT_PATH = DATA_DIR / "markets.snapshot"
+# Bump when the meaning of a saved array changes. A missing array is detected on
+# load and just triggers a rebuild, so adding columns needs no bump.
+SNAPSHOT_FORMAT = 7
+# Seconds between source-file checks by the background refresher; 0 disables polling.
+RELOAD_INTERVAL = float(os.environ.get("MARKET_RELOAD_INTERVAL", "30"))
+
+# Largest page a single /api/markets call may request.
+MAX_PAGE_LIMIT = 200
+
+# Default direction per sort key when the caller does not pass `order`.
+DEFAULT_SORT_ORDER = {"volume": "desc", "spread": "desc", "change24h": "desc", "endDate": "asc", "bestYes": "asc"}
+
+# Range filter query param -> (sort key, bound). Bounds are inclusive except endBefore.
+RANGE_FILTERS = {
+    "minVolume": ("volume", "low"),
+    "maxVolume": ("volume", "high"),
+    "minSpread": ("spread", "low"),
+    "maxSpread": ("spread", "high"),
+    "minChange": ("change24h", "low"),
+    "maxChange": ("change24h", "high"),
+    "minBestYes": ("bestYes", "low"),
+    "maxBestYes": ("bestYes", "high"),
+    "endAfter": ("endDate", "low"),
+    "endBefore": ("endDate", "high"),
+}
 
 KALSHI_CATEGORIES = ["Economics", "General Affairs", "Companies", "Science and Technology"]
 POLYMARKET_CATEGORIES = ["Weather", "Health", "Mentions", "Sports"]
 CATEGORIES = KALSHI_CATEGORIES + POLYMARKET_CATEGORIES
 
-HOURS = [
-    "12:00", "14:00", "16:00", "18:00", "20:00", "22:00", "00:00", "02:00",
-    "04:00", "06:00", "08:00", "10:00", "12:00", "14:00", "16:00", "18:00",
-    "20:00", "22:00", "00:00", "02:00", "04:00", "06:00", "08:00", "Now",
-]
-
-
-def _price_history(base_kalshi, base_poly):
-    points = []
-    k = base_kalshi - 0.15
-    p = base_poly - 0.12
-    for i in range(24):
-        k += (random.random() - 0.45) * 0.03
-        p += (random.random() - 0.45) * 0.03
-        k = max(0.01, min(0.99, k))
-        p = max(0.01, min(0.99, p))
-        points.append({
-            "time": HOURS[i],
-            "kalshiYes": round(k, 3),
-            "polymarketYes": round(p, 3),
-            "bestYes": round(min(k, p), 3),
-        })
-    return points
-
-
 def _slugify(text):
     slug = re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
     return slug[:80]
 
 
-def _build_market(raw_id, title, description, category, source, end_date="2027-12-31"):
-    k_yes = round(random.uniform(0.10, 0.90), 2)
-    p_yes = round(k_yes + random.uniform(-0.05, 0.05), 2)
-    p_yes = max(0.05, min(0.95, p_yes))
+def _enrich(columns, rng=None):
+    """Attach random pricing data to the raw market columns and build the store."""
+    rng = rng or np.random.default_rng()
+    n = len(columns["ids"])
 
-    k_no = round(1 - k_yes, 2)
-    p_no = round(1 - p_yes, 2)
+    k_yes = np.round(rng.uniform(0.10, 0.90, n), 2)
+    p_yes = np.clip(np.round(k_yes + rng.uniform(-0.05, 0.05, n), 2), 0.05, 0.95)
+    k_vol = rng.integers(50_000, 15_000_000, n, endpoint=True)
+    p_vol = rng.integers(50_000, 15_000_000, n, endpoint=True)
+    change24h = np.round(rng.uniform(-5.0, 5.0, n), 1)
 
-    k_vol = random.randint(50_000, 15_000_000)
-    p_vol = random.randint(50_000, 15_000_000)
+    # Random walk per platform, one vectorized step per history point.
+    history = np.empty((n, HISTORY_POINTS, 2), dtype=np.float32)
+    k = k_yes - 0.15
+    p = p_yes - 0.12
+    for i in range(HISTORY_POINTS):
+        k = np.clip(k + (rng.random(n) - 0.45) * 0.03, 0.01, 0.99)
+        p = np.clip(p + (rng.random(n) - 0.45) * 0.03, 0.01, 0.99)
+        history[:, i, 0] = k
+        history[:, i, 1] = p
 
-    spread = round(abs(k_yes - p_yes), 3)
-    best_yes_price = min(k_yes, p_yes)
-    best_yes_platform = "kalshi" if k_yes <= p_yes else "polymarket"
-    best_no_price = min(k_no, p_no)
-    best_no_platform = "kalshi" if k_no <= p_no else "polymarket"
+    return MarketStore(
+        columns["ids"], columns["titles"], columns["descriptions"], columns["categories"],
+        columns["sources"], columns["end_dates"],
+        k_yes, p_yes, k_vol, p_vol, change24h, history, CATEGORIES,
+    )
 
-    return {
-        "id": raw_id,
-        "title": title,
-        "category": category,
-        "description": description,
-        "endDate": end_date,
-        "status": "open",
-        "platforms": [
-            {
-                "platform": "kalshi",
-                "yesPrice": k_yes,
-                "noPrice": k_no,
-                "volume": k_vol,
-                "openInterest": k_vol // 3,
-            },
-            {
-                "platform": "polymarket",
-                "yesPrice": p_yes,
-                "noPrice": p_no,
-                "volume": p_vol,
-                "openInterest": p_vol // 3,
-            },
-        ],
-        "bestYes": {"price": best_yes_price, "platform": best_yes_platform},
-        "bestNo": {"price": best_no_price, "platform": best_no_platform},
-        "spread": spread,
-        "change24h": round(random.uniform(-5.0, 5.0), 1),
-        "totalVolume": k_vol + p_vol,
-        "priceHistory": _price_history(k_yes, p_yes),
-        "tags": [],
-        "rules": [],
-        "platformUrls": {},
-        "source": source,
-    }
-
-
-def _load_all():
-    all_markets = []
-    seen_ids = set()
 
+def _source_paths():
     kalshi_path = DATA_DIR / "kalshi_markets.json"
     poly_path = DATA_DIR / "polymarket_markets.json"
     fallback_dir = Path(__file__).parent / "collectors" / "data"
@@ -116,6 +113,21 @@ def _load_all():
         if fallback_poly_path.exists():
             poly_path = fallback_poly_path
 
+    return kalshi_path, poly_path
+
+
+def _load_all(kalshi_path, poly_path):
+    columns = {key: [] for key in ("ids", "titles", "descriptions", "categories", "sources", "end_dates")}
+    seen_ids = set()
+
+    def add(market_id, title, desc, category, source, end_date):
+        columns["ids"].append(market_id)
+        columns["titles"].append(title)
+        columns["descriptions"].append(desc)
+        columns["categories"].append(CATEGORIES.index(category))
+        columns["sources"].append(SOURCES.index(source))
+        columns["end_dates"].append(end_date)
+
     if kalshi_path.exists():
         with open(kalshi_path) as f:
             kalshi_data = json.load(f)
@@ -132,7 +144,7 @@ def _load_all():
                 if ticker in seen_ids:
                     continue
                 seen_ids.add(ticker)
-                all_markets.append(_build_market(ticker, title, desc, cat, "kalshi", end_date))
+                add(ticker, title, desc, cat, "kalshi", end_date)
 
     if poly_path.exists():
         with open(poly_path) as f:
@@ -151,41 +163,459 @@ def _load_all():
                 if mid in seen_ids:
                     mid = mid + "-" + str(random.randint(1000, 9999))
                 seen_ids.add(mid)
-                all_markets.append(_build_market(mid, title, desc, cat, "polymarket", end_date))
+                add(mid, title, desc, cat, "polymarket", end_date)
+
+    return _enrich(columns)
+
+
+def _encode_cursor(payload):
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor):
+    """Decode an opaque cursor; raises ValueError if it was not issued by us."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(payload, dict):
+        raise ValueError("Invalid cursor")
+    return payload
+
+
+class Catalog:
+    """Everything derived from one read of the source files."""
+
+    def __init__(self, store, fingerprint=None, search_index=None, version=None):
+        self.store = store
+        self.fingerprint = fingerprint
+        # Unique per build (prices are re-randomized on every rebuild) and carried in the
+        # snapshot, so workers loading the same snapshot agree on it.
+        self.version = version or os.urandom(6).hex()
+        self.search_index = search_index or SearchIndex(zip(store.titles, store.descriptions))
+        # Row numbers per category, already in (totalVolume desc, id) order.
+        self.category_views = {cat: store.rows_in_category(cat) for cat in CATEGORIES}
+        # Unfiltered facet counts never change for a given catalog version.
+        self.facets = store.facet_counts()
+
+
+def _source_fingerprint(paths):
+    """Identity of the source files: path, mtime and size of each one present."""
+    fingerprint = [SNAPSHOT_FORMAT]
+    for path in paths:
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            fingerprint.append((str(path), None, None))
+        else:
+            fingerprint.append((str(path), st.st_mtime_ns, st.st_size))
+    return tuple(fingerprint)
+
+
+def _jsonable(fingerprint):
+    return json.loads(json.dumps(fingerprint))
+
+
+def _read_snapshot(fingerprint):
+    try:
+        meta = json.loads((SNAPSHOT_DIR / "current.json").read_text())
+        if meta.get("format") != SNAPSHOT_FORMAT or meta.get("fingerprint") != _jsonable(fingerprint):
+            return None
+        arrays = {"store": {}, "index": {}}
+        for path in (SNAPSHOT_DIR / meta["version"]).glob("*.npy"):
+            group, name = path.stem.split(".", 1)
+            arrays[group][name] = np.load(path, mmap_mode="r", allow_pickle=False)
+        store = MarketStore.from_arrays(arrays["store"], meta["category_names"])
+        search_index = SearchIndex.from_arrays(arrays["index"], store.titles)
+        return Catalog(store, fingerprint, search_index=search_index, version=meta["version"])
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"[market_loader] Ignoring unreadable snapshot {SNAPSHOT_DIR}: {e!r}")
+        return None
+
+
+def _write_snapshot(catalog):
+    """
+    Save every array under SNAPSHOT_DIR/<version>/, then atomically repoint
+    current.json at it. Readers only follow current.json, so they see either
+    the previous snapshot or the complete new one.
+    """
+    pid = os.getpid()
+    tmp_dir = SNAPSHOT_DIR / f"{catalog.version}.{pid}.tmp"
+    pointer_tmp = SNAPSHOT_DIR / f"current.json.{pid}.tmp"
+    arrays = {f"store.{name}": values for name, values in catalog.store.to_arrays().items()}
+    arrays.update({f"index.{name}": values for name, values in catalog.search_index.to_arrays().items()})
+    meta = {
+        "format": SNAPSHOT_FORMAT,
+        "fingerprint": catalog.fingerprint,
+        "version": catalog.version,
+        "category_names": catalog.store.category_names,
+    }
+    try:
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        for name, values in arrays.items():
+            np.save(tmp_dir / f"{name}.npy", np.ascontiguousarray(values), allow_pickle=False)
+        os.replace(tmp_dir, SNAPSHOT_DIR / catalog.version)
+        pointer_tmp.write_text(json.dumps(meta))
+        os.replace(pointer_tmp, SNAPSHOT_DIR / "current.json")
+    except OSError as e:
+        print(f"[market_loader] Could not write snapshot {SNAPSHOT_DIR}: {e}")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        pointer_tmp.unlink(missing_ok=True)
+        return
+    # Older versions are no longer reachable; processes that mapped them keep their mappings.
+    for path in SNAPSHOT_DIR.iterdir():
+        if path.is_dir() and path.name != catalog.version and not path.name.endswith(".tmp"):
+            shutil.rmtree(path, ignore_errors=True)
+    LEGACY_SNAPSHOT_PATH.unlink(missing_ok=True)
+
+
+def load_catalog():
+    """Load the catalog from the snapshot if it is current, else rebuild and re-snapshot it."""
+    paths = _source_paths()
+    fingerprint = _source_fingerprint(paths)
+    catalog = _read_snapshot(fingerprint)
+    if catalog is not None:
+        return catalog
+    catalog = Catalog(_load_all(*paths), fingerprint)
+    if len(catalog.store):
+        _write_snapshot(catalog)
+    return catalog
 
-    all_markets.sort(key=lambda m: m["totalVolume"], reverse=True)
-    return all_markets
 
+_catalog = load_catalog()
+_reload_lock = threading.Lock()
+_reload_requested = threading.Event()
+_reload_force = False
+_refresher_stop = threading.Event()
+_refresher_thread = None
 
-# Loaded once at import time
-all_markets = _load_all()
-_index = {m["id"]: m for m in all_markets}
+print(f"[market_loader] Loaded {len(_catalog.store)} markets across {len(CATEGORIES)} categories")
 
-print(f"[market_loader] Loaded {len(all_markets)} markets across {len(CATEGORIES)} categories")
 
+def get_catalog():
+    """The current catalog. Callers should read it once and use that object throughout."""
+    return _catalog
 
-def get_market_by_id(market_id):
-    return _index.get(market_id)
 
+def reload_catalog(force=False):
+    """
+    Rebuild the catalog if the source files changed (or always, with `force`)
+    and swap it in. Returns True if a new catalog was installed.
+    """
+    global _catalog
+    with _reload_lock:
+        paths = _source_paths()
+        fingerprint = _source_fingerprint(paths)
+        if not force and fingerprint == _catalog.fingerprint:
+            return False
+        catalog = _read_snapshot(fingerprint) if not force else None
+        if catalog is None:
+            catalog = Catalog(_load_all(*paths), fingerprint)
+            if len(catalog.store):
+                _write_snapshot(catalog)
+        # Single reference assignment: readers see either the old catalog or the new one.
+        _catalog = catalog
+    print(f"[market_loader] Reloaded {len(catalog.store)} markets (version {catalog.version})")
+    return True
 
-def get_markets_page(category=None, q=None, page=1, limit=25):
+
+def request_reload(force=False):
+    """Ask the background refresher to check the source files now."""
+    global _reload_force
+    _reload_force = _reload_force or force
+    _reload_requested.set()
+
+
+def _refresh_loop(interval):
+    global _reload_force
+    while not _refresher_stop.is_set():
+        _reload_requested.wait(interval if interval > 0 else None)
+        if _refresher_stop.is_set():
+            break
+        force, _reload_force = _reload_force, False
+        _reload_requested.clear()
+        try:
+            reload_catalog(force=force)
+        except Exception as e:
+            print(f"[market_loader] Catalog reload failed, keeping version {_catalog.version}: {e}")
+
+
+def start_refresher(interval=RELOAD_INTERVAL):
+    global _refresher_thread
+    if _refresher_thread is not None and _refresher_thread.is_alive():
+        return
+    _refresher_stop.clear()
+    _refresher_thread = threading.Thread(
+        target=_refresh_loop, args=(interval,), name="market-catalog-refresher", daemon=True
+    )
+    _refresher_thread.start()
+
+
+def stop_refresher():
+    global _refresher_thread
+    _refresher_stop.set()
+    _reload_requested.set()
+    if _refresher_thread is not None:
+        _refresher_thread.join(timeout=5)
+        _refresher_thread = None
+
+
+def resolve_fields(fields=None, view=None):
+    """
+    Turn the `fields=` / `view=` query params into the tuple of top-level
+    market keys to build, or None for the full object. `fields` is a
+    comma-separated list and wins over `view`; `id` is always included.
+    Raises ValueError on an unknown field or view.
+    """
+    if fields:
+        requested = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in requested if f not in FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+        return tuple(dict.fromkeys(["id", *requested]))
+    if view is None or view == "full":
+        return None
+    if view == "summary":
+        return SUMMARY_FIELDS
+    raise ValueError("view must be full or summary")
+
+
+def get_market_by_id(market_id, fields=None, catalog=None):
+    store = (catalog or _catalog).store
+    row = store.row_by_id.get(market_id)
+    return store.materialize(row, fields) if row is not None else None
+
+
+def get_markets_by_ids(market_ids, fields=None, catalog=None):
+    """
+    Resolve many ids against one catalog. Returns (markets, missing): found
+    markets in request order (duplicates collapsed) and the ids not found.
+    """
+    store = (catalog or _catalog).store
+    markets, missing = [], []
+    for market_id in dict.fromkeys(market_ids):
+        row = store.row_by_id.get(market_id)
+        if row is None:
+            missing.append(market_id)
+        else:
+            markets.append(store.materialize(row, fields))
+    return markets, missing
+
+
+def get_mark_prices(market_ids, sides, platforms, catalog=None):
+    """
+    Current price per position for parallel (market_id, side, platform)
+    lists, marked in one vectorized pass over the store's price columns.
+    "no" prices are 1 - yes, rounded like the API's noPrice. Markets no
+    longer in the catalog get NaN.
+    """
+    store = (catalog or _catalog).store
+    rows = np.fromiter((store.row_by_id.get(m, -1) for m in market_ids), dtype=np.intp, count=len(market_ids))
+    known = rows >= 0
+    safe_rows = np.where(known, rows, 0)
+    kalshi = np.asarray(platforms) == "kalshi"
+    yes = np.where(kalshi, store.kalshi_yes[safe_rows], store.poly_yes[safe_rows]) if len(store) else np.zeros(len(rows))
+    price = np.where(np.asarray(sides) == "no", np.round(1 - yes, 2), yes)
+    return np.where(known, price, np.nan)
+
+
+def _search_rows(catalog, q):
+    """Row numbers matching `q`, ranked by relevance and then totalVolume."""
+    return np.asarray(catalog.search_index.search(q), dtype=np.intp)
+
+
+def resolve_page(page=1, limit=25):
+    """Validate `page=`/`limit=` params into ints; raises ValueError."""
+    try:
+        page, limit = int(page), int(limit)
+    except (TypeError, ValueError):
+        raise ValueError("page and limit must be integers")
+    if page < 1:
+        raise ValueError("page must be at least 1")
+    if not 1 <= limit <= MAX_PAGE_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_LIMIT}")
+    return page, limit
+
+
+def resolve_sort(sort=None, order=None):
+    """Validate `sort=`/`order=` params into a (key, direction) pair; raises ValueError."""
+    key = sort or "volume"
+    if key not in SORT_COLUMNS:
+        raise ValueError(f"sort must be one of: {', '.join(SORT_COLUMNS)}")
+    direction = order or DEFAULT_SORT_ORDER[key]
+    if direction not in SORT_DIRECTIONS:
+        raise ValueError("order must be asc or desc")
+    return key, direction
+
+
+def resolve_filters(**params):
+    """
+    Turn range filter query params (see RANGE_FILTERS) into
+    {sort key: (low, high)} on the store's column scale. Dates are ISO
+    `YYYY-MM-DD`; raises ValueError on an unknown filter or bad value.
+    """
+    ranges = {}
+    for name, raw in params.items():
+        if raw is None:
+            continue
+        if name not in RANGE_FILTERS:
+            raise ValueError(f"Unknown filter: {name}")
+        key, bound = RANGE_FILTERS[name]
+        if key == "endDate":
+            try:
+                value = int(np.datetime64(str(raw)[:10], "D").astype(np.int64))
+            except ValueError as e:
+                raise ValueError(f"{name} must be a YYYY-MM-DD date") from e
+        else:
+            value = float(raw)
+            if not math.isfinite(value):
+                raise ValueError(f"{name} must be a finite number")
+        low, high = ranges.get(key, (None, None))
+        ranges[key] = (value, high) if bound == "low" else (low, value)
+    return ranges
+
+
+def _filter_mask(store, rows, ranges, category):
+    mask = np.ones(len(rows), dtype=bool)
+    for key, (low, high) in ranges.items():
+        values = store.column(key)[rows]
+        if key in MISSING_VALUES:
+            mask &= values != MISSING_VALUES[key]
+        if low is not None:
+            mask &= values >= low
+        if high is not None:
+            # endBefore is exclusive so "closing before Friday" excludes Friday.
+            mask &= values < high if key == "endDate" else values <= high
     if category and category != "All":
-        filtered = [m for m in all_markets if m["category"] == category]
+        code = store.category_names.index(category) if category in store.category_names else -1
+        mask &= store.category_codes[rows] == code
+    return mask
+
+
+def _browse_rows(catalog, category, sort, ranges):
+    """
+    Rows for a non-search listing, in sort order. With range filters, the
+    most selective one is answered by binary search on its presorted
+    column; the rest are vectorized masks over that slice.
+    """
+    store = catalog.store
+    ranks = store.sort_ranks[sort]
+    if not ranges:
+        rows = store.sort_orders[sort]
+        if not category or category == "All":
+            return rows
+        if sort == ("volume", "desc"):
+            return catalog.category_views.get(category, np.empty(0, dtype=np.intp))
+        return rows[_filter_mask(store, rows, {}, category)]
+
+    slices = {
+        key: store.rows_in_range(key, low, high, high_exclusive=(key == "endDate"))
+        for key, (low, high) in ranges.items()
+    }
+    driver = min(slices, key=lambda key: len(slices[key]))
+    rows = slices[driver]
+    rest = {key: bounds for key, bounds in ranges.items() if key != driver}
+    rows = rows[_filter_mask(store, rows, rest, category)]
+    if (driver, "asc") != sort:
+        rows = rows[np.argsort(ranks[rows], kind="stable")]
+    return rows
+
+
+def get_facets(q=None, category=None, catalog=None):
+    """
+    Market counts per category, source and status. Without `q` the counts
+    are the ones precomputed for this catalog version; with `q` they are
+    tallied over the search index hits only. `category` narrows the source
+    and status counts but not the category counts.
+    """
+    catalog = catalog or _catalog
+    store = catalog.store
+    is_search = bool(q and q.strip())
+    has_category = bool(category and category != "All")
+    if not is_search and not has_category:
+        return catalog.facets
+
+    rows = _search_rows(catalog, q) if is_search else None
+    if not has_category:
+        return store.facet_counts(rows)
+    if rows is None:
+        narrowed = catalog.category_views.get(category, np.empty(0, dtype=np.intp))
     else:
-        filtered = all_markets
+        narrowed = rows[_filter_mask(store, rows, {}, category)]
+    facets = store.facet_counts(narrowed)
+    # Category counts ignore the selected category so a sidebar can still offer the others.
+    facets["categories"] = (catalog.facets if rows is None else store.facet_counts(rows))["categories"]
+    return facets
+
+
+def _cursor_start(store, rows, sort, cursor, is_search):
+    payload = _decode_cursor(cursor)
+    if is_search:
+        offset = payload.get("o")
+        if not isinstance(offset, int) or offset < 0:
+            raise ValueError("Invalid cursor")
+        return offset
+    market_id = payload.get("id")
+    if not isinstance(market_id, str):
+        raise ValueError("Invalid cursor")
+    last_row = store.row_by_id.get(market_id)
+    if last_row is None:
+        raise ValueError("Cursor is no longer valid; restart from the first page")
+    # Keyset seek: rows are in rank order, so find the first rank after the last one seen.
+    ranks = store.sort_ranks[sort]
+    return int(np.searchsorted(ranks[rows], ranks[last_row], side="right"))
 
-    if q:
-        q_lower = q.lower()
-        filtered = [m for m in filtered if q_lower in m["title"].lower() or q_lower in (m.get("description") or "").lower()]
 
-    total = len(filtered)
+def get_markets_page(category=None, q=None, page=1, limit=25, cursor=None, fields=None,
+                     sort=None, ranges=None, catalog=None):
+    """
+    One page of markets. Pass either `page` (1-based) or `cursor`, the
+    `nextCursor` of a previous response; cursors seek in O(log N) instead of
+    counting from the start, so deep pages cost the same as the first one.
+    `fields` (see resolve_fields) limits which keys each market carries,
+    `sort` is a (key, direction) pair from resolve_sort and `ranges` comes
+    from resolve_filters. Search results keep relevance order unless `sort`
+    is given.
+    """
+    catalog = catalog or _catalog
+    store = catalog.store
+    ranges = ranges or {}
+    is_search = bool(q and q.strip())
+    if is_search:
+        rows = _search_rows(catalog, q)
+        rows = rows[_filter_mask(store, rows, ranges, category)]
+        if sort is not None:
+            rows = rows[np.argsort(store.sort_ranks[sort][rows], kind="stable")]
+    else:
+        sort = sort or resolve_sort()
+        rows = _browse_rows(catalog, category, sort, ranges)
+
+    total = len(rows)
     total_pages = math.ceil(total / limit) if total > 0 else 1
-    start = (page - 1) * limit
+    if cursor:
+        start = _cursor_start(store, rows, sort, cursor, is_search)
+        page = start // limit + 1
+    else:
+        start = (page - 1) * limit
     end = start + limit
+    page_rows = rows[start:end]
+
+    next_cursor = None
+    if len(page_rows) and end < total:
+        if is_search:
+            next_cursor = _encode_cursor({"o": end})
+        else:
+            last = int(page_rows[-1])
+            next_cursor = _encode_cursor({"id": store.ids[last]})
 
     return {
-        "markets": filtered[start:end],
+        "markets": store.materialize_rows(page_rows, fields),
         "total": total,
         "page": page,
         "totalPages": total_pages,
+        "nextCursor": next_cursor,
     }
@@ -0,0 +1,274 @@
+"""
+Columnar, memory-compact market storage.
+
+Each market is a row: strings live in plain lists, numeric fields in NumPy
+columns, and every market's 24-point price history in one shared
+(N, 24, 2) float32 array. API dicts are only materialized for the rows a
+response actually returns.
+"""
+import numpy as np
+
+from .columnar import pack_strings, unpack_strings
+
+HOURS = [
+    "12:00", "14:00", "16:00", "18:00", "20:00", "22:00", "00:00", "02:00",
+    "04:00", "06:00", "08:00", "10:00", "12:00", "14:00", "16:00", "18:00",
+    "20:00", "22:00", "00:00", "02:00", "04:00", "06:00", "08:00", "Now",
+]
+HISTORY_POINTS = len(HOURS)
+
+SOURCES = ["kalshi", "polymarket"]
+STATUSES = ["open", "closed", "resolved"]
+
+# Sortable keys -> store column. Each gets presorted row orders (both directions)
+# and per-row ranks at build time, so sorting and range filters never sort per request.
+SORT_COLUMNS = {
+    "volume": "total_volume",
+    "spread": "spread",
+    "change24h": "change24h",
+    "endDate": "end_days",
+    "bestYes": "best_yes",
+}
+SORT_DIRECTIONS = ("asc", "desc")
+
+# Stored for markets without a parseable end date. Such rows sort after every
+# real date in both directions and never match an endDate range.
+_NO_END_DATE = np.iinfo(np.int64).max
+# Sort key -> column value meaning "no value".
+MISSING_VALUES = {"endDate": _NO_END_DATE}
+
+
+def _parse_end_days(end_dates):
+    """Days since the epoch for each ISO date (or timestamp) string."""
+    days = np.full(len(end_dates), _NO_END_DATE, dtype=np.int64)
+    for i, end_date in enumerate(end_dates):
+        try:
+            day = np.datetime64((end_date or "")[:10], "D")
+        except ValueError:
+            continue
+        # An empty string parses to NaT rather than failing.
+        if not np.isnat(day):
+            days[i] = day.astype(np.int64)
+    return days
+
+
+# Fields a list view needs to render a market card: no history, rules or description.
+SUMMARY_FIELDS = (
+    "id", "title", "category", "endDate", "status", "bestYes", "bestNo",
+    "spread", "change24h", "totalVolume", "source",
+)
+
+
+# Per-row columns persisted in a snapshot. Columns derived from these with a
+# vectorized op (total volume, spread, best yes, sort indexes) are rebuilt on load.
+_ARRAY_COLUMNS = (
+    "category_codes", "source_codes", "status_codes", "kalshi_yes", "poly_yes",
+    "kalshi_volume", "poly_volume", "change24h", "price_history", "end_days",
+)
+_STRING_COLUMNS = ("ids", "titles", "descriptions", "end_dates")
+
+
+class MarketStore:
+    def __init__(self, ids, titles, descriptions, categories, sources, end_dates,
+                 kalshi_yes, poly_yes, kalshi_volume, poly_volume, change24h,
+                 price_history, category_names):
+        """
+        Build a store from parallel columns. `categories` and `sources` are
+        integer codes into `category_names` and SOURCES. Rows are reordered by
+        (totalVolume desc, id), so row number doubles as the default sort rank.
+        """
+        total_volume = np.asarray(kalshi_volume, dtype=np.int64) + np.asarray(poly_volume, dtype=np.int64)
+        order = sorted(range(len(ids)), key=lambda i: (-int(total_volume[i]), ids[i]))
+        take = np.asarray(order, dtype=np.intp)
+
+        self.category_names = list(category_names)
+        self.ids = [ids[i] for i in order]
+        self.titles = [titles[i] for i in order]
+        self.descriptions = [descriptions[i] for i in order]
+        self.end_dates = [end_dates[i] for i in order]
+        self.category_codes = np.asarray(categories, dtype=np.uint8)[take]
+        self.source_codes = np.asarray(sources, dtype=np.uint8)[take]
+        # Every collected market is currently open; the column keeps status facetable.
+        self.status_codes = np.zeros(len(order), dtype=np.uint8)
+
+        self.kalshi_yes = np.asarray(kalshi_yes, dtype=np.float64)[take]
+        self.poly_yes = np.asarray(poly_yes, dtype=np.float64)[take]
+        self.kalshi_volume = np.asarray(kalshi_volume, dtype=np.int64)[take]
+        self.poly_volume = np.asarray(poly_volume, dtype=np.int64)[take]
+        self.change24h = np.asarray(change24h, dtype=np.float64)[take]
+        self.price_history = np.asarray(price_history, dtype=np.float32)[take]
+        self.end_days = _parse_end_days(self.end_dates)
+        self._build_derived()
+
+    def _build_derived(self):
+        self.total_volume = self.kalshi_volume + self.poly_volume
+        self.spread = np.round(np.abs(self.kalshi_yes - self.poly_yes), 3)
+        self.best_yes = np.minimum(self.kalshi_yes, self.poly_yes)
+        self.row_by_id = {market_id: row for row, market_id in enumerate(self.ids)}
+        self._build_sort_indexes()
+
+    def _build_sort_indexes(self):
+        rows = np.arange(len(self.ids))
+        self.sorted_values = {}
+        self.valid_counts = {}
+        self.sort_orders = {}
+        self.sort_ranks = {}
+        for key, column in SORT_COLUMNS.items():
+            values = getattr(self, column)
+            missing = values == MISSING_VALUES[key] if key in MISSING_VALUES else np.zeros(len(rows), dtype=bool)
+            # Primary key `missing` keeps rows without a value last in both directions;
+            # ties break on row number (i.e. volume).
+            asc = np.lexsort((rows, values, missing))
+            desc = np.lexsort((rows, -values, missing))
+            self.sorted_values[key] = values[asc]
+            self.valid_counts[key] = len(rows) - int(missing.sum())
+            for direction, order in (("asc", asc), ("desc", desc)):
+                rank = np.empty(len(order), dtype=np.int32)
+                rank[order] = np.arange(len(order), dtype=np.int32)
+                self.sort_orders[key, direction] = order.astype(np.int32)
+                self.sort_ranks[key, direction] = rank
+
+    def to_arrays(self):
+        """The persisted columns as a flat name -> ndarray mapping (see from_arrays)."""
+        arrays = {name: getattr(self, name) for name in _ARRAY_COLUMNS}
+        for name in _STRING_COLUMNS:
+            arrays[name], arrays[f"{name}_offsets"] = pack_strings(getattr(self, name))
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays, category_names):
+        """
+        Rebuild a store saved with to_arrays. Rows are already in store order;
+        persisted columns are used as given (e.g. memory-mapped).
+        """
+        store = cls.__new__(cls)
+        store.category_names = list(category_names)
+        for name in _ARRAY_COLUMNS:
+            setattr(store, name, arrays[name])
+        for name in _STRING_COLUMNS:
+            setattr(store, name, unpack_strings(arrays[name], arrays[f"{name}_offsets"]))
+        store._build_derived()
+        return store
+
+    def column(self, key):
+        return getattr(self, SORT_COLUMNS[key])
+
+    def rows_in_range(self, key, low=None, high=None, high_exclusive=False):
+        """
+        Rows whose `key` value lies in [low, high] (or [low, high) with
+        `high_exclusive`), found by binary search on the presorted column.
+        Rows without a value never match. Returned in ascending `key` order.
+        """
+        values = self.sorted_values[key][:self.valid_counts[key]]
+        start = 0 if low is None else np.searchsorted(values, low, side="left")
+        side = "left" if high_exclusive else "right"
+        end = len(values) if high is None else np.searchsorted(values, high, side=side)
+        return self.sort_orders[key, "asc"][start:end]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def category(self, row):
+        return self.category_names[self.category_codes[row]]
+
+    def rows_in_category(self, category):
+        try:
+            code = self.category_names.index(category)
+        except ValueError:
+            return np.empty(0, dtype=np.intp)
+        return np.flatnonzero(self.category_codes == code)
+
+    def facet_counts(self, rows=None):
+        """Market counts per category, source platform and status over `rows` (all if None)."""
+        def counts(codes, names):
+            values = codes if rows is None else codes[rows]
+            tally = np.bincount(values, minlength=len(names))
+            return {name: int(tally[i]) for i, name in enumerate(names)}
+
+        return {
+            "total": len(self) if rows is None else len(rows),
+            "categories": counts(self.category_codes, self.category_names),
+            "sources": counts(self.source_codes, SOURCES),
+            "status": counts(self.status_codes, STATUSES),
+        }
+
+    def _price_history(self, row):
+        points = []
+        for i, (k, p) in enumerate(self.price_history[row].tolist()):
+            points.append({
+                "time": HOURS[i],
+                "kalshiYes": round(k, 3),
+                "polymarketYes": round(p, 3),
+                "bestYes": round(min(k, p), 3),
+            })
+        return points
+
+    def _platforms(self, row):
+        k_yes = float(self.kalshi_yes[row])
+        p_yes = float(self.poly_yes[row])
+        k_vol = int(self.kalshi_volume[row])
+        p_vol = int(self.poly_volume[row])
+        return [
+            {
+                "platform": "kalshi",
+                "yesPrice": k_yes,
+                "noPrice": round(1 - k_yes, 2),
+                "volume": k_vol,
+                "openInterest": k_vol // 3,
+            },
+            {
+                "platform": "polymarket",
+                "yesPrice": p_yes,
+                "noPrice": round(1 - p_yes, 2),
+                "volume": p_vol,
+                "openInterest": p_vol // 3,
+            },
+        ]
+
+    def _best_yes(self, row):
+        k_yes = float(self.kalshi_yes[row])
+        p_yes = float(self.poly_yes[row])
+        return {"price": min(k_yes, p_yes), "platform": "kalshi" if k_yes <= p_yes else "polymarket"}
+
+    def _best_no(self, row):
+        k_no = round(1 - float(self.kalshi_yes[row]), 2)
+        p_no = round(1 - float(self.poly_yes[row]), 2)
+        return {"price": min(k_no, p_no), "platform": "kalshi" if k_no <= p_no else "polymarket"}
+
+    # Top-level market fields in response order, each built lazily from the columns.
+    _FIELD_BUILDERS = {
+        "id": lambda self, row: self.ids[row],
+        "title": lambda self, row: self.titles[row],
+        "category": lambda self, row: self.category(row),
+        "description": lambda self, row: self.descriptions[row],
+        "endDate": lambda self, row: self.end_dates[row],
+        "status": lambda self, row: STATUSES[self.status_codes[row]],
+        "platforms": _platforms,
+        "bestYes": _best_yes,
+        "bestNo": _best_no,
+        "spread": lambda self, row: float(self.spread[row]),
+        "change24h": lambda self, row: float(self.change24h[row]),
+        "totalVolume": lambda self, row: int(self.total_volume[row]),
+        "priceHistory": _price_history,
+        "tags": lambda self, row: [],
+        "rules": lambda self, row: [],
+        "platformUrls": lambda self, row: {},
+        "source": lambda self, row: SOURCES[self.source_codes[row]],
+    }
+
+    def materialize(self, row, fields=None):
+        """
+        Build the API dict for one row (same shape the frontend expects).
+        `fields`, if given, limits the dict to those top-level keys; the
+        others, e.g. priceHistory, are never built.
+        """
+        builders = self._FIELD_BUILDERS
+        if fields is None:
+            return {name: build(self, row) for name, build in builders.items()}
+        return {name: builders[name](self, row) for name in fields}
+
+    def materialize_rows(self, rows, fields=None):
+        return [self.materialize(int(row), fields) for row in rows]
+
+
+FIELDS = tuple(MarketStore._FIELD_BUILDERS)
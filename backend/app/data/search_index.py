@@ -0,0 +1,166 @@
+"""
+Inverted text index over market titles and descriptions.
+
+Documents are identified by their position in the catalog. Each distinct word
+gets a posting list per field (title / description), and the vocabulary itself
+is indexed by trigram so a query fragment like "bitc" resolves to every term
+containing it without touching the documents.
+"""
+import re
+from array import array
+
+from .columnar import pack_ragged, pack_strings, unpack_strings
+
+# Unicode-aware words on casefolded text, for indexing and queries alike.
+_TOKEN_RE = re.compile(r"\w+")
+
+# Per-query-term weights: exact word in title > fragment in title > description only.
+TITLE_EXACT_SCORE = 3
+TITLE_PARTIAL_SCORE = 2
+DESCRIPTION_SCORE = 1
+PHRASE_IN_TITLE_BONUS = 5
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall((text or "").casefold())
+
+
+def _trigrams(term):
+    return {term[i:i + 3] for i in range(len(term) - 2)}
+
+
+def _short_grams(term):
+    """Every 1- and 2-character substring of `term`."""
+    return {term[i:i + n] for n in (1, 2) for i in range(len(term) - n + 1)}
+
+
+class SearchIndex:
+    def __init__(self, docs):
+        """Build the index from an iterable of (title, description) pairs."""
+        self._terms = []
+        self._term_ids = {}
+        self._title_postings = []
+        self._desc_postings = []
+        self._titles = []
+
+        for doc_id, (title, description) in enumerate(docs):
+            title_folded = (title or "").casefold()
+            self._titles.append(title_folded)
+            title_terms = set(_TOKEN_RE.findall(title_folded))
+            for term in title_terms:
+                self._title_postings[self._term_id(term)].append(doc_id)
+            for term in set(tokenize(description)) - title_terms:
+                self._desc_postings[self._term_id(term)].append(doc_id)
+
+        self._build_vocabulary_lookups()
+
+    def _build_vocabulary_lookups(self):
+        # Vocabulary lookups: trigram -> term ids, and every 1/2-char substring -> term ids
+        # for query fragments too short to have a trigram. Either way a fragment
+        # matches a term if it occurs anywhere in it.
+        self._term_trigrams = {}
+        self._term_short_grams = {}
+        for term_id, term in enumerate(self._terms):
+            for gram in _trigrams(term):
+                self._term_trigrams.setdefault(gram, []).append(term_id)
+            for gram in _short_grams(term):
+                self._term_short_grams.setdefault(gram, []).append(term_id)
+
+    def __len__(self):
+        return len(self._titles)
+
+    def to_arrays(self):
+        """The index as flat NumPy arrays (see from_arrays); titles are not included."""
+        terms, term_offsets = pack_strings(self._terms)
+        title_docs, title_offsets = pack_ragged(self._title_postings)
+        desc_docs, desc_offsets = pack_ragged(self._desc_postings)
+        return {
+            "terms": terms, "term_offsets": term_offsets,
+            "title_docs": title_docs, "title_offsets": title_offsets,
+            "desc_docs": desc_docs, "desc_offsets": desc_offsets,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays, titles):
+        """Rebuild an index saved with to_arrays; postings stay views into the given arrays."""
+        index = cls.__new__(cls)
+        index._terms = unpack_strings(arrays["terms"], arrays["term_offsets"])
+        index._term_ids = {term: term_id for term_id, term in enumerate(index._terms)}
+        index._titles = [(title or "").casefold() for title in titles]
+        for name in ("title", "desc"):
+            docs, bounds = arrays[f"{name}_docs"], arrays[f"{name}_offsets"].tolist()
+            setattr(index, f"_{name}_postings", [docs[bounds[i]:bounds[i + 1]] for i in range(len(bounds) - 1)])
+        index._build_vocabulary_lookups()
+        return index
+
+    def _term_id(self, term):
+        term_id = self._term_ids.get(term)
+        if term_id is None:
+            term_id = len(self._terms)
+            self._term_ids[term] = term_id
+            self._terms.append(term)
+            self._title_postings.append(array("I"))
+            self._desc_postings.append(array("I"))
+        return term_id
+
+    def _matching_terms(self, fragment):
+        if len(fragment) < 3:
+            return self._term_short_grams.get(fragment, [])
+        grams = sorted((self._term_trigrams.get(g, ()) for g in _trigrams(fragment)), key=len)
+        if not grams or not grams[0]:
+            return []
+        candidates = set(grams[0])
+        for posting in grams[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                return []
+        return [t for t in candidates if fragment in self._terms[t]]
+
+    def search(self, q):
+        """
+        Return doc ids matching every term of `q`, best first.
+
+        Ties on relevance keep catalog order (doc id), which is already
+        sorted by totalVolume.
+        """
+        fragments = list(dict.fromkeys(tokenize(q)))
+        if not fragments:
+            return []
+
+        per_fragment = []
+        for fragment in fragments:
+            exact_id = self._term_ids.get(fragment)
+            title_hits = set()
+            desc_hits = set()
+            for term_id in self._matching_terms(fragment):
+                title_hits.update(self._title_postings[term_id].tolist())
+                desc_hits.update(self._desc_postings[term_id].tolist())
+            if not title_hits and not desc_hits:
+                return []
+            exact = set(self._title_postings[exact_id].tolist()) if exact_id is not None else set()
+            per_fragment.append((title_hits | desc_hits, title_hits, exact))
+
+        # Intersect from the smallest posting union outwards.
+        per_fragment.sort(key=lambda entry: len(entry[0]))
+        matched = set(per_fragment[0][0])
+        for hits, _, _ in per_fragment[1:]:
+            if not matched:
+                return []
+            matched.intersection_update(hits)
+
+        phrase = (q or "").strip().casefold()
+        scored = []
+        for doc_id in matched:
+            score = 0
+            for _, title_hits, exact in per_fragment:
+                if doc_id in exact:
+                    score += TITLE_EXACT_SCORE
+                elif doc_id in title_hits:
+                    score += TITLE_PARTIAL_SCORE
+                else:
+                    score += DESCRIPTION_SCORE
+            if len(fragments) > 1 and phrase in self._titles[doc_id]:
+                score += PHRASE_IN_TITLE_BONUS
+            scored.append((-score, doc_id))
+        scored.sort()
+        return [doc_id for _, doc_id in scored]
@@ -1,27 +1,99 @@
 """
 SQLite store. DB file lives at backend/app/data/data/users.db.
 Tables: users, bets, wallets.
+
+Each thread keeps one long-lived connection (see _connect), configured once
+for WAL so readers never block on the writer. Use `with _connect() as conn:`
+for writes; it commits or rolls back but leaves the connection open.
 """
+import base64
+import binascii
+import json
+import os
+import queue
 import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
 
-import bcrypt
 
 DB_PATH = Path(__file__).parent / "data" / "data" / "users.db"
+# Page cache per connection, in KiB.
+DB_CACHE_KIB = int(os.environ.get("DB_CACHE_KIB", "16384"))
+# Compiled statements kept per connection; every helper uses a fixed SQL string.
+DB_STATEMENT_CACHE = 128
+DB_BUSY_TIMEOUT_S = 5.0
+# Group commit: bets are queued to one writer thread that commits up to
+# MAX_BATCH of them per transaction, waiting at most MAX_WAIT_MS to fill a batch.
+DB_GROUP_COMMIT = os.environ.get("DB_GROUP_COMMIT", "").lower() in ("1", "true", "yes")
+DB_GROUP_COMMIT_MAX_BATCH = int(os.environ.get("DB_GROUP_COMMIT_MAX_BATCH", "64"))
+DB_GROUP_COMMIT_MAX_WAIT_S = float(os.environ.get("DB_GROUP_COMMIT_MAX_WAIT_MS", "2")) / 1000
+# In-process cache of user rows for auth; every helper that writes a user's data invalidates it.
+USER_CACHE_SIZE = int(os.environ.get("USER_CACHE_SIZE", "10000"))
+USER_CACHE_TTL_S = float(os.environ.get("USER_CACHE_TTL_S", "30"))
+BETS_PAGE_DEFAULT = 50
+BETS_PAGE_MAX = 200
+
+_local = threading.local()
+
+
+def _open_connection():
+    conn = sqlite3.connect(
+        str(DB_PATH),
+        timeout=DB_BUSY_TIMEOUT_S,
+        cached_statements=DB_STATEMENT_CACHE,
+    )
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    # Safe with WAL: a crash can lose the last commits but never corrupts the DB.
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA cache_size = -{DB_CACHE_KIB}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    return conn
 
 
 def _connect():
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(DB_PATH))
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON")
+    """This thread's pooled connection, opened and configured on first use."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = _open_connection()
+        _local.conn = conn
     return conn
 
 
-def _init_db():
-    conn = _connect()
+@contextmanager
+def _write_transaction(conn=None):
+    """
+    BEGIN IMMEDIATE on the pooled connection: the write lock is taken up
+    front, so check-then-write sequences cannot interleave with another writer.
+    """
+    conn = conn or _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def close_connection():
+    """Close the calling thread's pooled connection, if any."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        _local.conn = None
+        conn.close()
+
 
+# ── Schema migrations ─────────────────────────────────────────
+# Applied in order; PRAGMA user_version records how many have run. Append new
+# migrations to MIGRATIONS, never edit or reorder ones that have shipped.
+
+def _migration_base_schema(conn):
     conn.execute("""
         CREATE TABLE IF NOT EXISTS users (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -33,7 +105,7 @@ def _init_db():
         )
     """)
 
-    # Migrate: add balance column to existing users tables that lack it
+    # Databases created before the balance column existed
     cols = [r["name"] for r in conn.execute("PRAGMA table_info(users)").fetchall()]
     if "balance" not in cols:
         conn.execute("ALTER TABLE users ADD COLUMN balance REAL NOT NULL DEFAULT 500.0")
@@ -74,8 +146,75 @@ def _init_db():
         )
     """)
 
-    conn.commit()
-    conn.close()
+
+def _migration_bet_indexes(conn):
+    # A user's history newest-first is an index range scan, no sort; id breaks created_at ties.
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_bets_user_created ON bets (user_id, created_at, id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_bets_market ON bets (market_id)")
+
+
+def _backfill_portfolio_aggregates(conn):
+    conn.execute("DELETE FROM user_portfolio")
+    conn.execute("""
+        INSERT INTO user_portfolio (user_id, in_position_cost, bet_count)
+        SELECT user_id, SUM(total_cost), COUNT(*) FROM bets GROUP BY user_id
+    """)
+
+
+def _migration_portfolio_aggregates(conn):
+    # Kept in step with bets inside place_bet, so balance reads are one row per user.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS user_portfolio (
+            user_id INTEGER PRIMARY KEY REFERENCES users(id),
+            in_position_cost REAL NOT NULL DEFAULT 0,
+            bet_count INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    _backfill_portfolio_aggregates(conn)
+
+
+def _migration_bet_market_history_index(conn):
+    # History filtered to one market keeps the (created_at, id) order in the index too.
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_bets_user_market_created ON bets (user_id, market_id, created_at, id)")
+
+
+def _migration_drop_market_exposure(conn):
+    # Per-market totals were written on every bet but never read; positions come from bets.
+    conn.execute("DROP TABLE IF EXISTS user_market_exposure")
+
+
+MIGRATIONS = [
+    _migration_base_schema,
+    _migration_bet_indexes,
+    _migration_portfolio_aggregates,
+    _migration_bet_market_history_index,
+    _migration_drop_market_exposure,
+]
+
+
+def _schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    """Bring the schema up to len(MIGRATIONS), one transaction per migration."""
+    while _schema_version(conn) < len(MIGRATIONS):
+        # Re-read under the write lock: another worker may have migrated meanwhile.
+        with _write_transaction(conn):
+            version = _schema_version(conn)
+            if version >= len(MIGRATIONS):
+                break
+            MIGRATIONS[version](conn)
+            conn.execute(f"PRAGMA user_version = {version + 1}")
+        print(f"[db] Applied migration {version + 1}: {MIGRATIONS[version].__name__}")
+
+
+def _init_db():
+    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = _connect()
+    # Persistent per database file: readers get snapshots and do not block the writer.
+    conn.execute("PRAGMA journal_mode = WAL")
+    migrate(conn)
 
 
 _init_db()
@@ -83,6 +222,61 @@ _init_db()
 
 # ── User helpers ──────────────────────────────────────────────
 
+class _UserCache:
+    """
+    LRU of user rows with a TTL. Writers call invalidate() after committing;
+    a read that raced with an invalidation is not cached (see generation).
+    """
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            row, expires = entry
+            if expires <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return dict(row)
+
+    def generation(self):
+        """Token to take before reading a row from the DB and pass to put()."""
+        with self._lock:
+            return self._generation
+
+    def put(self, user_id, row, generation):
+        with self._lock:
+            # Something was invalidated since the read began; the row may predate that write.
+            if generation != self._generation:
+                return
+            self._entries[user_id] = (dict(row), time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *user_ids):
+        with self._lock:
+            self._generation += 1
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+
+_user_cache = _UserCache(USER_CACHE_SIZE, USER_CACHE_TTL_S)
+
+
+def get_cached_user(user_id):
+    """The cached row for `user_id`, or None on a miss; never touches the DB."""
+    return _user_cache.get(user_id)
+
+
 def _user_dict(row):
     if row is None:
         return None
@@ -94,134 +288,396 @@ def _user_dict(row):
     }
 
 
-def create_user(name, email, password):
-    pw_hash = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+def create_user(name, email, password_hash):
+    """Insert a user with an already-computed hash (see app.passwords); None if the email is taken."""
     now = datetime.now(timezone.utc).isoformat()
-    conn = _connect()
     try:
-        conn.execute(
-            "INSERT INTO users (name, email, password_hash, created_at) VALUES (?, ?, ?, ?)",
-            (name, email, pw_hash, now),
-        )
-        conn.commit()
-        row = conn.execute("SELECT * FROM users WHERE email = ?", (email,)).fetchone()
+        with _connect() as conn:
+            conn.execute(
+                "INSERT INTO users (name, email, password_hash, created_at) VALUES (?, ?, ?, ?)",
+                (name, email, password_hash, now),
+            )
+            row = conn.execute("SELECT * FROM users WHERE email = ?", (email,)).fetchone()
         return _user_dict(row)
     except sqlite3.IntegrityError:
         return None
-    finally:
-        conn.close()
 
 
 def get_user_by_email(email):
-    conn = _connect()
-    row = conn.execute("SELECT * FROM users WHERE email = ?", (email,)).fetchone()
-    conn.close()
+    row = _connect().execute("SELECT * FROM users WHERE email = ?", (email,)).fetchone()
     return dict(row) if row else None
 
 
 def get_user_by_id(user_id):
-    conn = _connect()
-    row = conn.execute("SELECT * FROM users WHERE id = ?", (user_id,)).fetchone()
-    conn.close()
-    return dict(row) if row else None
-
-
-def verify_password(plain, hashed):
-    return bcrypt.checkpw(plain.encode(), hashed.encode())
+    cached = _user_cache.get(user_id)
+    if cached is not None:
+        return cached
+    generation = _user_cache.generation()
+    row = _connect().execute("SELECT * FROM users WHERE id = ?", (user_id,)).fetchone()
+    if row is None:
+        return None
+    _user_cache.put(user_id, row, generation)
+    return dict(row)
 
 
 def get_balance(user_id):
-    conn = _connect()
-    row = conn.execute("SELECT balance FROM users WHERE id = ?", (user_id,)).fetchone()
-    conn.close()
+    row = _connect().execute("SELECT balance FROM users WHERE id = ?", (user_id,)).fetchone()
     return row["balance"] if row else 0.0
 
 
 def add_balance(user_id, amount):
     if amount <= 0:
         return get_balance(user_id)
-    conn = _connect()
-    try:
+    with _connect() as conn:
         conn.execute("UPDATE users SET balance = balance + ? WHERE id = ?", (amount, user_id))
-        conn.commit()
         row = conn.execute("SELECT balance FROM users WHERE id = ?", (user_id,)).fetchone()
-        return row["balance"] if row else 0.0
-    finally:
-        conn.close()
+    _user_cache.invalidate(user_id)
+    return row["balance"] if row else 0.0
+
+
+# ── Portfolio aggregates ──────────────────────────────────────
+
+def backfill_portfolio_aggregates():
+    """Rebuild user_portfolio from the bets table."""
+    with _write_transaction() as conn:
+        _backfill_portfolio_aggregates(conn)
+    return conn.execute("SELECT COUNT(*) FROM user_portfolio").fetchone()[0]
+
+
+def _record_bet_aggregates(conn, user_id, costs):
+    """Fold new bets (their `costs`) into the user's portfolio row."""
+    conn.execute(
+        "INSERT INTO user_portfolio (user_id, in_position_cost, bet_count) VALUES (?, ?, ?) "
+        "ON CONFLICT (user_id) DO UPDATE SET in_position_cost = in_position_cost + excluded.in_position_cost, "
+        "bet_count = bet_count + excluded.bet_count",
+        (user_id, sum(costs), len(costs)),
+    )
+
+
+def get_portfolio_summary(user_id):
+    """Balance plus in-position cost and bet count, from one row lookup."""
+    row = _connect().execute(
+        "SELECT u.balance, COALESCE(p.in_position_cost, 0) AS in_position_cost, COALESCE(p.bet_count, 0) AS bet_count "
+        "FROM users u LEFT JOIN user_portfolio p ON p.user_id = u.id WHERE u.id = ?",
+        (user_id,),
+    ).fetchone()
+    if row is None:
+        return {"balance": 0.0, "in_position_cost": 0.0, "bet_count": 0}
+    return dict(row)
 
 
 # ── Bet helpers ───────────────────────────────────────────────
 
+def _apply_bet(conn, user_id, market_id, market_title, side, shares, price_per_share, total_cost, platform):
+    """Debit and insert one bet inside the caller's write transaction; None if the balance is short."""
+    now = datetime.now(timezone.utc).isoformat()
+    # The balance check and the debit are one statement, so concurrent bets cannot overdraw.
+    row = conn.execute(
+        "UPDATE users SET balance = balance - ? WHERE id = ? AND balance >= ? RETURNING balance",
+        (total_cost, user_id, total_cost),
+    ).fetchone()
+    if row is None:
+        return None
+    bet_row = conn.execute(
+        "INSERT INTO bets (user_id, market_id, market_title, side, shares, price_per_share, total_cost, platform, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) RETURNING *",
+        (user_id, market_id, market_title, side, shares, price_per_share, total_cost, platform, now),
+    ).fetchone()
+    _record_bet_aggregates(conn, user_id, [total_cost])
+    return dict(bet_row), float(row["balance"])
+
+
+def _check_bet_cost(total_cost):
+    # A zero or negative cost would leave the balance as is or credit it.
+    if not total_cost > 0:
+        raise ValueError("Bet cost must be positive")
+
+
 def place_bet(user_id, market_id, market_title, side, shares, price_per_share, total_cost, platform):
-    conn = _connect()
-    try:
-        row = conn.execute("SELECT balance FROM users WHERE id = ?", (user_id,)).fetchone()
-        if not row or row["balance"] < total_cost:
+    """
+    Debit the balance and record the bet in one write transaction.
+    Returns (bet, new_balance), or None if the balance does not cover total_cost.
+    Raises ValueError if total_cost is not positive.
+    With DB_GROUP_COMMIT the bet is committed by the batch writer instead.
+    """
+    _check_bet_cost(total_cost)
+    args = (user_id, market_id, market_title, side, shares, price_per_share, total_cost, platform)
+    if DB_GROUP_COMMIT:
+        return _bet_writer.submit(args).result()
+    with _write_transaction() as conn:
+        result = _apply_bet(conn, *args)
+    if result is not None:
+        _user_cache.invalidate(user_id)
+    return result
+
+
+class _BetWriter:
+    """
+    Single writer thread for group commit. Each batch is one transaction with
+    a savepoint per bet, so a failing bet is rolled back alone; every caller's
+    future resolves with its own result once the batch has committed.
+    """
+
+    def __init__(self, max_batch, max_wait):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, args):
+        future = Future()
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="unifeed-db-writer", daemon=True)
+                self._thread.start()
+        self._queue.put((args, future))
+        return future
+
+    def stop(self):
+        """Commit whatever is queued, then stop the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def _next_batch(self):
+        item = self._queue.get()
+        if item is None:
             return None
-        conn.execute("UPDATE users SET balance = balance - ? WHERE id = ?", (total_cost, user_id))
-        now = datetime.now(timezone.utc).isoformat()
-        conn.execute(
+        batch = [item]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # Stop after committing this batch.
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while (batch := self._next_batch()) is not None:
+            self._commit(batch)
+        close_connection()
+
+    def _commit(self, batch):
+        conn = _connect()
+        results = []
+        try:
+            with _write_transaction(conn):
+                for args, _ in batch:
+                    conn.execute("SAVEPOINT bet")
+                    try:
+                        results.append(_apply_bet(conn, *args))
+                    except Exception as e:
+                        conn.execute("ROLLBACK TO bet")
+                        results.append(e)
+                    conn.execute("RELEASE bet")
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        _user_cache.invalidate(*{args[0] for args, _ in batch})
+        for (_, future), result in zip(batch, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+_bet_writer = _BetWriter(DB_GROUP_COMMIT_MAX_BATCH, DB_GROUP_COMMIT_MAX_WAIT_S)
+
+
+def submit_bet(user_id, market_id, market_title, side, shares, price_per_share, total_cost, platform):
+    """Queue a bet to the group-commit writer; returns a Future of place_bet's result."""
+    return _bet_writer.submit((user_id, market_id, market_title, side, shares, price_per_share, total_cost, platform))
+
+
+def stop_group_commit():
+    _bet_writer.stop()
+
+
+def place_basket(user_id, legs):
+    """
+    Place several bets atomically: one balance check and debit for the summed
+    cost, then every leg inserted in the same write transaction. `legs` are
+    dicts with market_id, market_title, side, shares, price_per_share,
+    total_cost and platform. Returns (bets, new_balance), or None if the
+    balance does not cover the basket. Raises ValueError if any leg's
+    total_cost is not positive.
+    """
+    for leg in legs:
+        _check_bet_cost(leg["total_cost"])
+    now = datetime.now(timezone.utc).isoformat()
+    total_cost = round(sum(leg["total_cost"] for leg in legs), 2)
+    with _write_transaction() as conn:
+        row = conn.execute(
+            "UPDATE users SET balance = balance - ? WHERE id = ? AND balance >= ? RETURNING balance",
+            (total_cost, user_id, total_cost),
+        ).fetchone()
+        if row is None:
+            return None
+        # The write lock is held, so the new legs get the ids right after the current high-water mark.
+        seq = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'bets'").fetchone()
+        last_id = seq["seq"] if seq else 0
+        conn.executemany(
             "INSERT INTO bets (user_id, market_id, market_title, side, shares, price_per_share, total_cost, platform, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
-            (user_id, market_id, market_title, side, shares, price_per_share, total_cost, platform, now),
+            [
+                (user_id, leg["market_id"], leg["market_title"], leg["side"], leg["shares"],
+                 leg["price_per_share"], leg["total_cost"], leg["platform"], now)
+                for leg in legs
+            ],
         )
-        conn.commit()
-        bet_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
-        bet_row = conn.execute("SELECT * FROM bets WHERE id = ?", (bet_id,)).fetchone()
-        return dict(bet_row)
-    finally:
-        conn.close()
+        bet_rows = conn.execute(
+            "SELECT * FROM bets WHERE id > ? AND user_id = ? ORDER BY id", (last_id, user_id)
+        ).fetchall()
+        _record_bet_aggregates(conn, user_id, [leg["total_cost"] for leg in legs])
+    _user_cache.invalidate(user_id)
+    return [dict(r) for r in bet_rows], float(row["balance"])
 
 
 def get_user_bets(user_id):
-    conn = _connect()
-    rows = conn.execute("SELECT * FROM bets WHERE user_id = ? ORDER BY created_at DESC", (user_id,)).fetchall()
-    conn.close()
+    rows = _connect().execute("SELECT * FROM bets WHERE user_id = ? ORDER BY created_at DESC", (user_id,)).fetchall()
+    return [dict(r) for r in rows]
+
+
+def _encode_bet_cursor(created_at, bet_id):
+    raw = json.dumps([created_at, bet_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_bet_cursor(cursor):
+    """(created_at, id) of the last bet on the previous page; raises ValueError if malformed."""
+    try:
+        created_at, bet_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(created_at, str) or not isinstance(bet_id, int):
+        raise ValueError("Invalid cursor")
+    return created_at, bet_id
+
+
+def _created_at_bound(value, name):
+    """Normalize a YYYY-MM-DD date or ISO timestamp to compare against stored created_at strings."""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError as e:
+        raise ValueError(f"{name} must be an ISO date or timestamp") from e
+    if len(value) == 10:
+        return value
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).isoformat()
+
+
+def _bet_filters(user_id, market_id, platform, since, until):
+    """WHERE clauses and params selecting a user's bets; `since` inclusive, `until` exclusive."""
+    clauses = ["user_id = ?"]
+    params = [user_id]
+    if market_id:
+        clauses.append("market_id = ?")
+        params.append(market_id)
+    if platform:
+        clauses.append("platform = ?")
+        params.append(platform)
+    if since:
+        clauses.append("created_at >= ?")
+        params.append(_created_at_bound(since, "since"))
+    if until:
+        clauses.append("created_at < ?")
+        params.append(_created_at_bound(until, "until"))
+    return clauses, params
+
+
+def get_user_bets_page(user_id, limit=BETS_PAGE_DEFAULT, cursor=None, market_id=None, platform=None,
+                       since=None, until=None):
+    """
+    One page of a user's bets, newest first. `cursor` is the `nextCursor` of
+    the previous page and seeks on (created_at, id) through the bet indexes,
+    so every page costs the same however long the history is. `since` is
+    inclusive and `until` exclusive. Raises ValueError on bad arguments.
+    """
+    limit = int(limit)
+    if not 1 <= limit <= BETS_PAGE_MAX:
+        raise ValueError(f"limit must be between 1 and {BETS_PAGE_MAX}")
+    clauses, params = _bet_filters(user_id, market_id, platform, since, until)
+    if cursor:
+        clauses.append("(created_at, id) < (?, ?)")
+        params.extend(_decode_bet_cursor(cursor))
+    # One extra row tells whether another page follows.
+    rows = _connect().execute(
+        f"SELECT * FROM bets WHERE {' AND '.join(clauses)} ORDER BY created_at DESC, id DESC LIMIT ?",
+        (*params, limit + 1),
+    ).fetchall()
+    bets = [dict(r) for r in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = _encode_bet_cursor(bets[-1]["created_at"], bets[-1]["id"])
+    return {"bets": bets, "nextCursor": next_cursor}
+
+
+def get_net_positions(user_id, market_id=None, platform=None, since=None, until=None):
+    """
+    The user's bets netted per (market_id, side, platform) in SQL: total
+    shares and cost, share-weighted average price, bet count, first bet id
+    and latest bet time. Most recently traded first. Filters as in
+    get_user_bets_page; raises ValueError on a bad date.
+    """
+    clauses, params = _bet_filters(user_id, market_id, platform, since, until)
+    rows = _connect().execute(
+        "SELECT market_id, side, platform, MAX(market_title) AS market_title, "
+        "SUM(shares) AS shares, SUM(total_cost) AS cost, "
+        "COALESCE(SUM(shares * price_per_share) / NULLIF(SUM(shares), 0), 0) AS avg_price, "
+        "COUNT(*) AS bet_count, MIN(id) AS first_bet_id, MAX(created_at) AS last_bet_at "
+        f"FROM bets WHERE {' AND '.join(clauses)} "
+        "GROUP BY market_id, side, platform "
+        "ORDER BY last_bet_at DESC, first_bet_id DESC",
+        params,
+    ).fetchall()
     return [dict(r) for r in rows]
 
 
 # ── Wallet helpers ────────────────────────────────────────────
 
 def save_wallet(user_id, address, chain):
-    conn = _connect()
     now = datetime.now(timezone.utc).isoformat()
-    try:
+    with _connect() as conn:
         conn.execute(
             "INSERT OR REPLACE INTO wallets (user_id, address, chain, connected_at) VALUES (?, ?, ?, ?)",
             (user_id, address, chain, now),
         )
-        conn.commit()
         row = conn.execute("SELECT * FROM wallets WHERE user_id = ?", (user_id,)).fetchone()
-        return dict(row) if row else None
-    finally:
-        conn.close()
+    _user_cache.invalidate(user_id)
+    return dict(row) if row else None
 
 
 def get_wallet(user_id):
-    conn = _connect()
-    row = conn.execute("SELECT * FROM wallets WHERE user_id = ?", (user_id,)).fetchone()
-    conn.close()
+    row = _connect().execute("SELECT * FROM wallets WHERE user_id = ?", (user_id,)).fetchone()
     return dict(row) if row else None
 
 
 def remove_wallet(user_id):
-    conn = _connect()
-    conn.execute("DELETE FROM wallets WHERE user_id = ?", (user_id,))
-    conn.commit()
-    conn.close()
+    with _connect() as conn:
+        conn.execute("DELETE FROM wallets WHERE user_id = ?", (user_id,))
+    _user_cache.invalidate(user_id)
 
 
 # ── Settings helpers ──────────────────────────────────────────
 
 def get_user_settings(user_id):
-    conn = _connect()
-    row = conn.execute("SELECT * FROM user_settings WHERE user_id = ?", (user_id,)).fetchone()
-    conn.close()
+    row = _connect().execute("SELECT * FROM user_settings WHERE user_id = ?", (user_id,)).fetchone()
     return dict(row) if row else None
 
 
 def upsert_user_settings(user_id, kalshi_api_key=None, kalshi_api_secret=None, preferred_payment_token=None, preferred_payment_chain_id=None):
-    conn = _connect()
-    try:
+    with _connect() as conn:
         current = conn.execute("SELECT * FROM user_settings WHERE user_id = ?", (user_id,)).fetchone()
         if not current:
             conn.execute(
@@ -246,9 +702,18 @@ def upsert_user_settings(user_id, kalshi_api_key=None, kalshi_api_secret=None, p
             if updates:
                 params.append(user_id)
                 conn.execute(f"UPDATE user_settings SET {', '.join(updates)} WHERE user_id = ?", tuple(params))
-        conn.commit()
-        
+
         row = conn.execute("SELECT * FROM user_settings WHERE user_id = ?", (user_id,)).fetchone()
-        return dict(row) if row else None
-    finally:
-        conn.close()
+    _user_cache.invalidate(user_id)
+    return dict(row) if row else None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="UniFeed database maintenance")
+    parser.add_argument("command", choices=["backfill-aggregates"])
+    args = parser.parse_args()
+    if args.command == "backfill-aggregates":
+        users = backfill_portfolio_aggregates()
+        print(f"[db] Rebuilt portfolio aggregates for {users} users")
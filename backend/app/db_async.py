@@ -0,0 +1,70 @@
+"""
+Async facade over app.db for async routes.
+
+Every call runs the matching sync helper on a dedicated DB thread pool, so
+awaiting the database never ties up the event loop or Starlette's shared
+threadpool. Each DB thread keeps its own pooled connection (see app.db).
+"""
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from app import db
+
+DB_THREADS = int(os.environ.get("DB_THREADS", "8"))
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=DB_THREADS, thread_name_prefix="unifeed-db")
+    return _executor
+
+
+async def run(fn, *args, **kwargs):
+    """Run a blocking DB callable on the DB pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(fn, *args, **kwargs))
+
+
+def _async(fn):
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        return await run(fn, *args, **kwargs)
+    return wrapper
+
+
+def shutdown():
+    # The next lifespan (e.g. a second TestClient in one process) starts a fresh pool.
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+    db.stop_group_commit()
+
+
+async def place_bet(*args):
+    if db.DB_GROUP_COMMIT:
+        # Await the batch writer's future directly rather than parking a DB thread on it.
+        return await asyncio.wrap_future(db.submit_bet(*args))
+    return await run(db.place_bet, *args)
+
+
+create_user = _async(db.create_user)
+get_user_by_email = _async(db.get_user_by_email)
+get_user_by_id = _async(db.get_user_by_id)
+get_balance = _async(db.get_balance)
+add_balance = _async(db.add_balance)
+get_portfolio_summary = _async(db.get_portfolio_summary)
+place_basket = _async(db.place_basket)
+get_user_bets = _async(db.get_user_bets)
+get_user_bets_page = _async(db.get_user_bets_page)
+get_net_positions = _async(db.get_net_positions)
+save_wallet = _async(db.save_wallet)
+get_wallet = _async(db.get_wallet)
+remove_wallet = _async(db.remove_wallet)
+get_user_settings = _async(db.get_user_settings)
+upsert_user_settings = _async(db.upsert_user_settings)
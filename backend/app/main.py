@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -7,16 +8,32 @@ from fastapi import FastAPI, Query
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.routers import markets, portfolio, news, auth, bets, wallet, swap, settings
-from app.analysis import main as analyze_main
+from app.analysis import close_http_client, main as analyze_main
+from app.data import start_refresher, stop_refresher
+from app import db_async, passwords
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 NEWSDATA_PATH = os.path.join(BASE_DIR, "newsdata.json")
 REDDITDATA_PATH = os.path.join(BASE_DIR, "redditdata.json")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pick up new collector output without restarting the API.
+    start_refresher()
+    passwords.start()
+    yield
+    stop_refresher()
+    db_async.shutdown()
+    passwords.shutdown()
+    await close_http_client()
+
+
 app = FastAPI(
     title="UniFeed API",
     description="Prediction market aggregator backend. Replace mock data in app.data with your DB or external APIs.",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -50,8 +67,8 @@ def health():
 # ─── Analysis endpoints ───────────────────────────────────────────
 
 @app.post("/analyze/")
-def analyze_topic(topic: str = Query(...)):
-    result = analyze_main(topic)
+async def analyze_topic(topic: str = Query(...)):
+    result = await analyze_main(topic)
     return {"result": result}
 
 
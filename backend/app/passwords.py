@@ -0,0 +1,100 @@
+"""
+Password hashing off the event loop.
+
+bcrypt runs in a dedicated, size-bounded process pool so a burst of
+signups/signins uses its own cores instead of the threads that serve
+market and DB reads. At most PASSWORD_MAX_PENDING calls may be queued or
+running; past that, callers get PasswordPoolBusy right away instead of
+waiting behind the queue. A pool whose worker died is replaced once per
+call; if the replacement fails too, callers get PasswordPoolBusy as well.
+"""
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import bcrypt
+
+# bcrypt cost factor for new hashes; existing hashes keep the cost they were made with.
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", "12"))
+# Half the cores by default, leaving the rest for the API itself.
+PASSWORD_WORKERS = int(os.environ.get("PASSWORD_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+PASSWORD_MAX_PENDING = int(os.environ.get("PASSWORD_MAX_PENDING", str(PASSWORD_WORKERS * 8)))
+
+_executor = None
+_pending = 0
+
+
+class PasswordPoolBusy(Exception):
+    """Raised when PASSWORD_MAX_PENDING hashing calls are already in flight, or the pool keeps breaking."""
+
+
+def _hash(plain, rounds):
+    return bcrypt.hashpw(plain.encode(), bcrypt.gensalt(rounds)).decode()
+
+
+def _check(plain, hashed):
+    return bcrypt.checkpw(plain.encode(), hashed.encode())
+
+
+def _warm_up():
+    pass
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        # spawn: workers start clean instead of forking a process that already runs threads.
+        _executor = ProcessPoolExecutor(
+            max_workers=PASSWORD_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+def _discard_executor(executor):
+    global _executor
+    # Another call may already have replaced the broken pool.
+    if _executor is executor:
+        _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def _submit(fn, *args):
+    # Only touched from the event loop thread, so a plain counter is enough.
+    global _pending
+    if _pending >= PASSWORD_MAX_PENDING:
+        raise PasswordPoolBusy()
+    _pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            executor = _get_executor()
+            try:
+                return await loop.run_in_executor(executor, fn, *args)
+            except BrokenProcessPool:
+                print(f"[passwords] Worker pool broke, replacing it (attempt {attempt + 1})")
+                _discard_executor(executor)
+        raise PasswordPoolBusy()
+    finally:
+        _pending -= 1
+
+
+async def hash_password(plain):
+    return await _submit(_hash, plain, BCRYPT_ROUNDS)
+
+
+async def verify_password(plain, hashed):
+    return await _submit(_check, plain, hashed)
+
+
+def start():
+    """Spawn the workers now, in the background, so the first sign-in does not wait for them."""
+    _get_executor().submit(_warm_up)
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,80 @@
+"""
+Cache of pre-encoded JSON responses with strong ETags.
+
+Entries are tied to a data version (e.g. the market catalog version); the
+first lookup under a new version drops everything cached for the old one.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from fastapi import Request, Response
+
+
+def encode_json(content):
+    # Same encoding Starlette's JSONResponse uses.
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def _etag_matches(request: Request, etag):
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class ResponseCache:
+    def __init__(self, max_entries=2048):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+    def _lookup(self, version, key):
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+                return None
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _store(self, version, key, entry):
+        with self._lock:
+            # A newer version was installed while this entry was being built.
+            if version != self._version:
+                return
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, version, key, build):
+        """Return (body, etag) for `key`, calling `build()` for the content on a miss."""
+        entry = self._lookup(version, key)
+        if entry is None:
+            body = encode_json(build())
+            etag = f'"{version}-{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+            entry = (body, etag)
+            self._store(version, key, entry)
+        return entry
+
+    def respond(self, request: Request, version, key, build):
+        """Serve `key` from the cache, answering a matching If-None-Match with 304."""
+        body, etag = self.get(version, key, build)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if _etag_matches(request, etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._version = None
@@ -1,17 +1,28 @@
+import hashlib
 import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 
 import jwt
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 
-from app.db import create_user, get_user_by_email, get_user_by_id, verify_password, _user_dict
+from app.db import _user_dict, get_cached_user
+from app.db_async import create_user, get_user_by_email, get_user_by_id
+from app.passwords import PasswordPoolBusy, hash_password, verify_password
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 JWT_SECRET = os.environ.get("JWT_SECRET", "unifeed-dev-secret-key-min-32-bytes!")
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRY_DAYS = 7
+TOKEN_CACHE_SIZE = int(os.environ.get("TOKEN_CACHE_SIZE", "10000"))
+
+# Verified tokens: digest -> (user_id, exp). A hit skips signature and claim checks until exp.
+_token_cache = OrderedDict()
+_token_cache_lock = threading.Lock()
 
 
 def _make_token(user_id):
@@ -23,14 +34,29 @@ def _make_token(user_id):
 
 
 def _decode_token(token):
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    with _token_cache_lock:
+        entry = _token_cache.get(key)
+        if entry is not None:
+            user_id, exp = entry
+            # Same rule as jwt.decode: the token is expired once now >= exp.
+            if time.time() < exp:
+                _token_cache.move_to_end(key)
+                return user_id
+            del _token_cache[key]
     try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        return int(payload["sub"])
+        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM], options={"require": ["exp"]})
+        user_id = int(payload["sub"])
     except (jwt.ExpiredSignatureError, jwt.InvalidTokenError, KeyError, ValueError):
         return None
+    with _token_cache_lock:
+        _token_cache[key] = (user_id, payload["exp"])
+        while len(_token_cache) > TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+    return user_id
 
 
-def get_current_user(request: Request):
+async def get_current_user(request: Request):
     """Reusable dependency: decode Bearer token -> return user dict or raise 401."""
     auth = request.headers.get("Authorization", "")
     if not auth.startswith("Bearer "):
@@ -38,12 +64,17 @@ def get_current_user(request: Request):
     user_id = _decode_token(auth[7:])
     if user_id is None:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
-    row = get_user_by_id(user_id)
+    # Cache hit: no hop to the DB thread pool at all.
+    row = get_cached_user(user_id) or await get_user_by_id(user_id)
     if not row:
         raise HTTPException(status_code=401, detail="User not found")
     return _user_dict(row)
 
 
+def _busy():
+    return HTTPException(status_code=503, detail="Too many sign-in attempts, retry shortly", headers={"Retry-After": "1"})
+
+
 class SignUpBody(BaseModel):
     name: str
     email: str
@@ -56,8 +87,12 @@ class SignInBody(BaseModel):
 
 
 @router.post("/signup")
-def signup(body: SignUpBody):
-    user = create_user(body.name, body.email, body.password)
+async def signup(body: SignUpBody):
+    try:
+        password_hash = await hash_password(body.password)
+    except PasswordPoolBusy:
+        raise _busy()
+    user = await create_user(body.name, body.email, password_hash)
     if not user:
         raise HTTPException(status_code=409, detail="Email already registered")
     token = _make_token(user["id"])
@@ -65,9 +100,13 @@ def signup(body: SignUpBody):
 
 
 @router.post("/signin")
-def signin(body: SignInBody):
-    row = get_user_by_email(body.email)
-    if not row or not verify_password(body.password, row["password_hash"]):
+async def signin(body: SignInBody):
+    row = await get_user_by_email(body.email)
+    try:
+        valid = bool(row) and await verify_password(body.password, row["password_hash"])
+    except PasswordPoolBusy:
+        raise _busy()
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid email or password")
     user = _user_dict(row)
     token = _make_token(user["id"])
@@ -75,6 +114,6 @@ def signin(body: SignInBody):
 
 
 @router.get("/me")
-def me(request: Request):
-    user = get_current_user(request)
+async def me(request: Request):
+    user = await get_current_user(request)
     return {"user": user}
@@ -1,42 +1,84 @@
 from fastapi import APIRouter, HTTPException, Request
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
-from app.db import place_bet, get_user_bets, get_balance
+from app.db_async import place_bet, place_basket, get_user_bets_page
 from app.routers.auth import get_current_user
 
 router = APIRouter(prefix="/api/bets", tags=["bets"])
 
+BASKET_MAX_LEGS = 50
+
 
 class PlaceBetBody(BaseModel):
     market_id: str
     market_title: str
     side: str
-    shares: float
-    price_per_share: float
+    shares: float = Field(gt=0)
+    price_per_share: float = Field(gt=0, le=1)
     platform: str
 
 
 @router.post("")
-def create_bet(body: PlaceBetBody, request: Request):
-    user = get_current_user(request)
+async def create_bet(body: PlaceBetBody, request: Request):
+    user = await get_current_user(request)
     total_cost = round(body.shares * body.price_per_share, 2)
-    bet = place_bet(
-        user["id"],
-        body.market_id,
-        body.market_title,
-        body.side,
-        body.shares,
-        body.price_per_share,
-        total_cost,
-        body.platform,
-    )
-    if bet is None:
+    try:
+        result = await place_bet(
+            user["id"],
+            body.market_id,
+            body.market_title,
+            body.side,
+            body.shares,
+            body.price_per_share,
+            total_cost,
+            body.platform,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if result is None:
         raise HTTPException(status_code=400, detail="Insufficient balance")
-    balance = get_balance(user["id"])
+    bet, balance = result
     return {"bet": bet, "balance": balance}
 
 
+class PlaceBasketBody(BaseModel):
+    legs: list[PlaceBetBody]
+
+
+@router.post("/basket")
+async def create_basket(body: PlaceBasketBody, request: Request):
+    """Place every leg or none: one balance check and debit for the basket total, one commit."""
+    if not body.legs:
+        raise HTTPException(status_code=400, detail="Basket has no legs")
+    if len(body.legs) > BASKET_MAX_LEGS:
+        raise HTTPException(status_code=400, detail=f"At most {BASKET_MAX_LEGS} legs per basket")
+    user = await get_current_user(request)
+    legs = [
+        {**leg.model_dump(), "total_cost": round(leg.shares * leg.price_per_share, 2)}
+        for leg in body.legs
+    ]
+    try:
+        result = await place_basket(user["id"], legs)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if result is None:
+        raise HTTPException(status_code=400, detail="Insufficient balance")
+    bets, balance = result
+    return {"bets": bets, "balance": balance}
+
+
 @router.get("")
-def list_bets(request: Request):
-    user = get_current_user(request)
-    return get_user_bets(user["id"])
+async def list_bets(request: Request, limit=50, cursor=None, market_id=None, platform=None, since=None, until=None):
+    """
+    The user's bets newest first, one page at a time: pass the previous
+    response's `nextCursor` as `cursor`. Optional `market_id`, `platform` and
+    `since`/`until` (ISO date or timestamp, `until` exclusive) filters.
+    """
+    user = await get_current_user(request)
+    try:
+        return await get_user_bets_page(
+            user["id"], limit=limit, cursor=cursor, market_id=market_id, platform=platform,
+            since=since, until=until,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
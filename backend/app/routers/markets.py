@@ -1,29 +1,169 @@
-from fastapi import APIRouter, HTTPException
+import os
+import secrets
 
-from app.data import get_market_by_id, get_markets_page, generate_orderbook, CATEGORIES
+from fastapi import APIRouter, HTTPException, Query, Request
+from pydantic import BaseModel
+
+from app.data import (
+    get_catalog,
+    get_facets,
+    get_market_by_id,
+    get_markets_by_ids,
+    get_markets_page,
+    generate_orderbook,
+    request_reload,
+    resolve_fields,
+    resolve_filters,
+    resolve_page,
+    resolve_sort,
+    CATEGORIES,
+)
+from app.response_cache import ResponseCache
 
 router = APIRouter(prefix="/api/markets", tags=["markets"])
 
+ADMIN_API_TOKEN = os.environ.get("ADMIN_API_TOKEN", "")
+BATCH_GET_MAX_IDS = 100
+BATCH_POST_MAX_IDS = 1000
+
+# Encoded market responses, keyed by request params and dropped on every catalog swap.
+_responses = ResponseCache(max_entries=int(os.environ.get("MARKET_RESPONSE_CACHE_SIZE", "2048")))
+
+
+def _require_admin(request: Request):
+    if not ADMIN_API_TOKEN:
+        raise HTTPException(503, "Admin API token not configured")
+    token = request.headers.get("X-Admin-Token", "")
+    if not secrets.compare_digest(token, ADMIN_API_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
 
 @router.get("")
-def list_markets(category=None, q=None, page=1, limit=25):
-    """List markets with pagination and optional category/search filter."""
-    return get_markets_page(category=category, q=q, page=int(page), limit=int(limit))
+def list_markets(
+    request: Request,
+    category=None,
+    q=None,
+    page=1,
+    limit=25,
+    cursor=None,
+    fields=None,
+    view=None,
+    sort=None,
+    order=None,
+    minVolume=None,
+    maxVolume=None,
+    minSpread=None,
+    maxSpread=None,
+    minChange=None,
+    maxChange=None,
+    minBestYes=None,
+    maxBestYes=None,
+    endAfter=None,
+    endBefore=None,
+):
+    """
+    List markets with page or cursor pagination (`limit` 1-200) and optional category/search filter.
+    `fields=id,title,...` or `view=summary` trims each market to the keys a list view needs.
+    `sort=volume|spread|change24h|endDate|bestYes` with `order=asc|desc`, plus range
+    filters (min/max Volume, Spread, Change, BestYes; endAfter/endBefore as YYYY-MM-DD).
+    """
+    try:
+        projection = resolve_fields(fields, view)
+        page, limit = resolve_page(page, limit)
+        sort_by = resolve_sort(sort, order) if sort or order else None
+        ranges = resolve_filters(
+            minVolume=minVolume, maxVolume=maxVolume, minSpread=minSpread, maxSpread=maxSpread,
+            minChange=minChange, maxChange=maxChange, minBestYes=minBestYes, maxBestYes=maxBestYes,
+            endAfter=endAfter, endBefore=endBefore,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    catalog = get_catalog()
+
+    def build():
+        try:
+            return get_markets_page(
+                category=category, q=q, page=page, limit=limit, cursor=cursor, fields=projection,
+                sort=sort_by, ranges=ranges, catalog=catalog,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    key = ("list", category, q, page, limit, cursor, projection, sort_by, tuple(sorted(ranges.items())))
+    return _responses.respond(request, catalog.version, key, build)
 
 
 @router.get("/categories")
-def list_categories():
+def list_categories(request: Request):
     """Return available category names."""
-    return CATEGORIES
+    return _responses.respond(request, get_catalog().version, ("categories",), lambda: CATEGORIES)
+
+
+@router.get("/facets")
+def list_facets(request: Request, q=None, category=None):
+    """Market counts per category, source platform and status, optionally for a search query."""
+    catalog = get_catalog()
+    return _responses.respond(
+        request, catalog.version, ("facets", q, category), lambda: get_facets(q, category, catalog)
+    )
+
+
+class BatchLookupBody(BaseModel):
+    ids: list[str]
+    fields: str | None = None
+    view: str | None = None
+
+
+def _batch_lookup(ids, fields, view, max_ids):
+    if len(ids) > max_ids:
+        raise HTTPException(status_code=400, detail=f"At most {max_ids} ids per request")
+    try:
+        projection = resolve_fields(fields, view)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    found, missing = get_markets_by_ids(ids, projection)
+    return {"markets": found, "missing": missing}
+
+
+@router.get("/batch")
+def get_markets_batch(ids: list[str] = Query(default=[]), fields=None, view=None):
+    """Resolve many markets in one call: `?ids=a,b,c` (or repeated `ids=`)."""
+    market_ids = [i.strip() for raw in ids for i in raw.split(",") if i.strip()]
+    return _batch_lookup(market_ids, fields, view, BATCH_GET_MAX_IDS)
+
+
+@router.post("/batch")
+def post_markets_batch(body: BatchLookupBody):
+    """Same as GET /batch for id lists too long for a query string."""
+    return _batch_lookup(body.ids, body.fields, body.view, BATCH_POST_MAX_IDS)
+
+
+@router.post("/reload", status_code=202)
+def trigger_reload(request: Request, force: bool = False):
+    """Admin: ask the background refresher to rebuild the catalog from the collector output."""
+    _require_admin(request)
+    request_reload(force=force)
+    return {"status": "scheduled", "version": get_catalog().version}
 
 
 @router.get("/{market_id}")
-def get_market(market_id):
-    """Get a single market by ID."""
-    market = get_market_by_id(market_id)
-    if not market:
-        raise HTTPException(status_code=404, detail="Market not found")
-    return market
+def get_market(request: Request, market_id, fields=None, view=None):
+    """Get a single market by ID, optionally projected with `fields=` or `view=summary`."""
+    try:
+        projection = resolve_fields(fields, view)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    catalog = get_catalog()
+
+    def build():
+        market = get_market_by_id(market_id, projection, catalog)
+        if not market:
+            raise HTTPException(status_code=404, detail="Market not found")
+        return market
+
+    return _responses.respond(request, catalog.version, ("market", market_id, projection), build)
 
 
 @router.get("/{market_id}/news")
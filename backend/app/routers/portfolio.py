@@ -1,17 +1,19 @@
-from fastapi import APIRouter, Request
+import numpy as np
+from fastapi import APIRouter, HTTPException, Request
 
-from app.db import get_balance, get_user_bets
+from app.data import get_mark_prices
+from app.db_async import get_net_positions, get_portfolio_summary
 from app.routers.auth import get_current_user
 
 router = APIRouter(prefix="/api/portfolio", tags=["portfolio"])
 
 
 @router.get("/balance")
-def get_user_balance(request: Request):
-    user = get_current_user(request)
-    balance = get_balance(user["id"])
-    bets = get_user_bets(user["id"])
-    in_positions = sum(b["total_cost"] for b in bets)
+async def get_user_balance(request: Request):
+    user = await get_current_user(request)
+    summary = await get_portfolio_summary(user["id"])
+    balance = summary["balance"]
+    in_positions = summary["in_position_cost"]
     return {
         "total": round(balance + in_positions, 2),
         "available": round(balance, 2),
@@ -22,22 +24,39 @@ def get_user_balance(request: Request):
 
 
 @router.get("/positions")
-def list_positions(request: Request):
-    user = get_current_user(request)
-    bets = get_user_bets(user["id"])
+async def list_positions(request: Request, market_id=None, platform=None, since=None, until=None):
+    """
+    Net positions per (market, side, platform), marked to the catalog's
+    current prices. Filters as in GET /api/bets; page through individual
+    bets there.
+    """
+    user = await get_current_user(request)
+    try:
+        rows = await get_net_positions(user["id"], market_id=market_id, platform=platform, since=since, until=until)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    shares = np.array([r["shares"] for r in rows], dtype=np.float64)
+    avg_price = np.array([r["avg_price"] for r in rows], dtype=np.float64)
+    marks = get_mark_prices([r["market_id"] for r in rows], [r["side"] for r in rows], [r["platform"] for r in rows])
+    # Markets dropped from the catalog keep their entry price (zero PnL).
+    current = np.where(np.isnan(marks), avg_price, marks)
+    pnl = np.round((current - avg_price) * shares, 2)
+    pnl_percent = np.round(np.divide(current - avg_price, avg_price, out=np.zeros_like(avg_price), where=avg_price > 0) * 100, 2)
+
     positions = []
-    for b in bets:
+    for i, r in enumerate(rows):
         positions.append({
-            "id": f"p{b['id']}",
-            "marketId": b["market_id"],
-            "marketTitle": b["market_title"],
-            "side": b["side"],
-            "platform": b["platform"],
-            "quantity": b["shares"],
-            "avgPrice": b["price_per_share"],
-            "currentPrice": b["price_per_share"],
-            "pnl": 0.0,
-            "pnlPercent": 0.0,
-            "timestamp": b["created_at"],
+            "id": f"p{r['first_bet_id']}",
+            "marketId": r["market_id"],
+            "marketTitle": r["market_title"],
+            "side": r["side"],
+            "platform": r["platform"],
+            "quantity": r["shares"],
+            "avgPrice": round(float(avg_price[i]), 4),
+            "currentPrice": float(current[i]),
+            "pnl": float(pnl[i]),
+            "pnlPercent": float(pnl_percent[i]),
+            "timestamp": r["last_bet_at"],
         })
-    return positions
+    return {"positions": positions}
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 
-from app.db import get_user_settings, upsert_user_settings
+from app.db_async import get_user_settings, upsert_user_settings
 from app.routers.auth import get_current_user
 
 router = APIRouter(prefix="/api/settings", tags=["settings"])
@@ -15,9 +15,9 @@ class SettingsUpdateBody(BaseModel):
 
 
 @router.get("")
-def get_settings(request: Request):
-    user = get_current_user(request)
-    settings = get_user_settings(user["id"])
+async def get_settings(request: Request):
+    user = await get_current_user(request)
+    settings = await get_user_settings(user["id"])
     if not settings:
         return {
             "kalshi_api_key": None,
@@ -34,9 +34,9 @@ def get_settings(request: Request):
 
 
 @router.get("/full")
-def get_settings_full(request: Request):
-    user = get_current_user(request)
-    settings = get_user_settings(user["id"])
+async def get_settings_full(request: Request):
+    user = await get_current_user(request)
+    settings = await get_user_settings(user["id"])
     if not settings:
         return {
             "kalshi_api_key": None,
@@ -48,9 +48,9 @@ def get_settings_full(request: Request):
 
 
 @router.patch("")
-def update_settings(body: SettingsUpdateBody, request: Request):
-    user = get_current_user(request)
-    result = upsert_user_settings(
+async def update_settings(body: SettingsUpdateBody, request: Request):
+    user = await get_current_user(request)
+    result = await upsert_user_settings(
         user["id"],
         kalshi_api_key=body.kalshi_api_key,
         kalshi_api_secret=body.kalshi_api_secret,
@@ -26,7 +26,7 @@ def _require_key():
 
 @router.get("/tokens")
 async def swap_tokens(request: Request, chainId: int = Query(137)):
-    get_current_user(request)
+    await get_current_user(request)
     _require_key()
     async with httpx.AsyncClient() as client:
         r = await client.get(
@@ -47,7 +47,7 @@ async def swap_quote(
     dst: str = Query(...),
     amount: str = Query(...),
 ):
-    get_current_user(request)
+    await get_current_user(request)
     _require_key()
     async with httpx.AsyncClient() as client:
         r = await client.get(
@@ -76,7 +76,7 @@ async def swap_price(
     amount: str = Query(...),
 ):
     """Lighter-weight pricing: returns just amounts and gas without routing details."""
-    get_current_user(request)
+    await get_current_user(request)
     _require_key()
     async with httpx.AsyncClient() as client:
         r = await client.get(
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 
-from app.db import save_wallet, get_wallet, remove_wallet
+from app.db_async import save_wallet, get_wallet, remove_wallet
 from app.routers.auth import get_current_user
 
 router = APIRouter(prefix="/api/wallet", tags=["wallet"])
@@ -13,21 +13,21 @@ class ConnectWalletBody(BaseModel):
 
 
 @router.post("")
-def connect_wallet(body: ConnectWalletBody, request: Request):
-    user = get_current_user(request)
-    wallet = save_wallet(user["id"], body.address, body.chain)
+async def connect_wallet(body: ConnectWalletBody, request: Request):
+    user = await get_current_user(request)
+    wallet = await save_wallet(user["id"], body.address, body.chain)
     return wallet
 
 
 @router.get("")
-def read_wallet(request: Request):
-    user = get_current_user(request)
-    wallet = get_wallet(user["id"])
+async def read_wallet(request: Request):
+    user = await get_current_user(request)
+    wallet = await get_wallet(user["id"])
     return wallet
 
 
 @router.delete("")
-def disconnect_wallet(request: Request):
-    user = get_current_user(request)
-    remove_wallet(user["id"])
+async def disconnect_wallet(request: Request):
+    user = await get_current_user(request)
+    await remove_wallet(user["id"])
     return {"ok": True}
@@ -78,7 +78,7 @@ export function PortfolioView() {
       ),
     ])
       .then(([pos, bal]) => {
-        setPositions(pos);
+        setPositions(pos.positions ?? []);
         setBalance(bal);
       })
       .catch(() => {})
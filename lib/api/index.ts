@@ -2,6 +2,7 @@ export { API_BASE_URL, useMockData, apiUrl } from "./config"
 export {
   getMarkets,
   getMarketById,
+  getMarketsByIds,
   getMarketSentiment,
   getAnalysisNews,
   getAnalysisDiscussions,
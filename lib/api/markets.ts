@@ -65,6 +65,23 @@ export async function getMarketById(id: string): Promise<Market | null> {
   return res.json()
 }
 
+/** Resolve many markets in one round trip (watchlists, portfolio rows). Unknown ids are skipped. */
+export async function getMarketsByIds(ids: string[]): Promise<Market[]> {
+  if (ids.length === 0) return []
+  if (useMockData) {
+    const wanted = new Set(ids)
+    return mockMarkets.filter((m) => wanted.has(m.id))
+  }
+  const res = await fetch(apiUrl("/api/markets/batch"), {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ ids }),
+  })
+  if (!res.ok) throw new Error("Failed to fetch markets")
+  const data: { markets: Market[]; missing: string[] } = await res.json()
+  return data.markets
+}
+
 export async function getMarketSentiment(slug: string): Promise<string> {
   if (useMockData) {
     return "Sentiment analysis is not available in mock mode."
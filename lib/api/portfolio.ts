@@ -8,7 +8,8 @@ export async function getPositions(): Promise<Position[]> {
   }
   const res = await fetch(apiUrl("/api/portfolio/positions"))
   if (!res.ok) throw new Error("Failed to fetch positions")
-  return res.json()
+  const body: { positions: Position[] } = await res.json()
+  return body.positions
 }
 
 export async function getUserBalance(): Promise<UserBalance> {
@@ -8,7 +8,7 @@ if [ ! -d "node_modules" ]; then
 fi
 
 # Wipe the database so login state is never persisted across restarts
-rm -f backend/app/data/data/users.db
+rm -f backend/app/data/data/users.db backend/app/data/data/users.db-wal backend/app/data/data/users.db-shm
 
 # Start the Python backend
 cd backend